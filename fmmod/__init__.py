@@ -0,0 +1,29 @@
+"""GUI-free core of the mod viewer and patcher: decoders, indexes and the patch engine.
+
+Nothing in this package imports tkinter or PIL, so it can be scripted or run on a server.
+``python -m fmmod`` is its command line front end.
+"""
+from .text import CHAR_MAP, TextCodec
+from .disc import SECTOR_SIZE, RAW_SECTOR_SIZE, DiscImage, DiscFile, sector_layout, open_source
+from .tables import CardStatTable, DropMatrix, DropperIndex
+from .fusion import FusionTable, FusionSolver
+from .search import SearchIndex
+from .cache import ParseCache
+from .delta import (
+    DELTA_CHUNK_SIZE, delta_records_from_journal, iter_patched_chunks,
+    write_ppf3_patch, read_ppf3_patch, check_ips_reach, write_ips_patch, read_ips_patch,
+    encode_bps_number, decode_bps_number, write_bps_patch, apply_bps_patch, apply_delta_patch,
+)
+from .catalogue import CATALOGUE_VERSION, BUILTIN_CATALOGUE, USER_CATALOGUE_DIR, PatchCatalogue, load_catalogue, default_catalogue
+from .patching import PatchScanner, PatchEngine, PATCH_GROUPS, OUTPUT_MODES, DELTA_MODES
+from .data import ModData
+
+BATCH_NAMES = ("BATCH_MODES", "BatchEngine", "find_images", "run_batch")
+
+
+def __getattr__(name):
+    # The batch runner pulls in multiprocessing, so it is only imported when first asked for
+    if name in BATCH_NAMES:
+        from . import batch
+        return getattr(batch, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
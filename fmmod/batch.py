@@ -0,0 +1,103 @@
+"""Patch many ISO/BIN images in parallel worker processes."""
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .patching import PatchEngine, DELTA_MODES
+from .catalogue import default_catalogue
+
+IMAGE_EXTENSIONS = (".iso", ".bin")
+# Modes that memory-map each image rather than reading it whole, so a worker's memory stays bounded
+BATCH_MODES = ("clone", "in_place") + DELTA_MODES
+
+worker_engine = None  # This worker process's BatchEngine, set up once by init_worker
+
+
+class BatchEngine(PatchEngine):
+    """PatchEngine that collects its errors for the batch report instead of showing them."""
+
+    def __init__(self):
+        super().__init__()
+        self.errors = []
+
+    def report_error(self, message):
+        self.errors.append(message)
+
+
+def find_images(source):
+    """Return the images in a directory, or those listed one per line in a manifest file."""
+    if os.path.isdir(source):
+        paths = []
+        for name in sorted(os.listdir(source)):
+            stem, extension = os.path.splitext(name)
+            # Skip outputs of earlier runs sitting next to their sources
+            if extension.lower() in IMAGE_EXTENSIONS and not stem.endswith(("_Patched", "_Reversed")):
+                paths.append(os.path.join(source, name))
+        return paths
+    base = os.path.dirname(os.path.abspath(source))
+    paths = []
+    with open(source, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                paths.append(line if os.path.isabs(line) else os.path.join(base, line))
+    # A path listed twice would be patched by two workers at once
+    return list(dict.fromkeys(paths))
+
+
+def init_worker(enabled_patches, parameters, force, quiet):
+    global worker_engine
+    if quiet:
+        sys.stdout = open(os.devnull, "w")  # The engine's per-change log would interleave across workers
+    worker_engine = BatchEngine()
+    worker_engine.enabled_patches = set(enabled_patches)
+    worker_engine.patch_parameters = dict(parameters)
+    worker_engine.force = force
+    worker_engine.get_patch_scanner()  # Compile the signatures once; every image in this worker reuses them
+
+
+def patch_one(image_path, output_mode):
+    """Patch one image with this worker's engine and return a summary dict."""
+    engine = worker_engine
+    engine.applied_patches = []
+    engine.errors = []
+    started = time.perf_counter()
+    result = {"image": image_path, "status": "unchanged", "output": None, "ranges": 0, "bytes": 0, "patches": {},
+              "error": None, "warnings": []}
+    try:
+        output_file_path = engine.patch_image(image_path, output_mode)
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = f"{type(e).__name__}: {e}"
+    else:
+        result["output"] = output_file_path
+        # Changes can be found and still all be rejected on apply (out of range, no longer intact)
+        if engine.applied_patches:
+            result["status"] = "patched"
+            result["ranges"] = len(engine.applied_patches)
+            result["bytes"] = sum(len(patch['modified']) for patch in engine.applied_patches)
+            result["patches"] = dict(Counter(patch['patch_name'] for patch in engine.applied_patches))
+    result["warnings"] = engine.errors
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def run_batch(image_paths, enabled_patches, *, parameters=None, force=False, output_mode="clone", workers=None,
+              quiet=True):
+    """Patch every image on a process pool, yielding each result as soon as its worker finishes.
+
+    parameters holds patch catalogue parameter values, such as {"drop_rate": "1000"}.
+    """
+    if output_mode not in BATCH_MODES:
+        raise ValueError(f"Batch output mode must be one of {', '.join(BATCH_MODES)}")
+    parameters = dict(parameters or {})
+    # Checked here, as a bad value would otherwise break every worker's initializer
+    catalogue = default_catalogue()
+    catalogue.parameter_values(parameters)
+    initargs = (sorted(enabled_patches), parameters, force, quiet)
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=initargs) as executor:
+        futures = [executor.submit(patch_one, image_path, output_mode) for image_path in image_paths]
+        for future in as_completed(futures):
+            yield future.result()
@@ -0,0 +1,83 @@
+"""On-disk cache of decoded SLUS/WA_MRG tables."""
+import os
+import time
+import zlib
+import pickle
+import hashlib
+
+from .disc import open_source
+
+HASH_READ_SIZE = 4 * 1024 * 1024  # Bytes read at a time while hashing a source file
+
+
+class ParseCache:
+    """SQLite store of decoded SLUS/WA_MRG tables, keyed by a BLAKE2 digest of the source files."""
+
+    # Bump whenever a decoder changes what it produces so stale entries are ignored
+    VERSION = 8
+
+    def __init__(self, path, max_entries=16):
+        self.path = path
+        self.max_entries = max_entries
+
+    @staticmethod
+    def digest(data):
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+    @staticmethod
+    def file_digest(path, chunk_size=HASH_READ_SIZE):
+        digest = hashlib.blake2b(digest_size=16)
+        with open_source(path) as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def connect(self):
+        import sqlite3  # Deferred: only loading and saving tables touch the cache, not start-up
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        connection = sqlite3.connect(self.path)
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, version INTEGER NOT NULL, last_used REAL NOT NULL, data BLOB NOT NULL)"
+        )
+        return connection
+
+    def get(self, key):
+        """Return the cached tables for key, or None on a miss, a version mismatch or a broken cache."""
+        import sqlite3
+        try:
+            connection = self.connect()
+            try:
+                row = connection.execute("SELECT version, data FROM entries WHERE key = ?", (key,)).fetchone()
+                if row is None or row[0] != self.VERSION:
+                    return None
+                with connection:
+                    connection.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+                return pickle.loads(zlib.decompress(row[1]))
+            finally:
+                connection.close()
+        except (sqlite3.Error, pickle.UnpicklingError, zlib.error, EOFError, AttributeError) as e:
+            print(f"Parse cache read failed for {key}: {e}")
+            return None
+
+    def put(self, key, tables):
+        """Store tables under key and evict the least recently used entries beyond max_entries."""
+        import sqlite3
+        try:
+            data = zlib.compress(pickle.dumps(tables, protocol=pickle.HIGHEST_PROTOCOL))
+            connection = self.connect()
+            try:
+                with connection:
+                    connection.execute(
+                        "INSERT OR REPLACE INTO entries (key, version, last_used, data) VALUES (?, ?, ?, ?)",
+                        (key, self.VERSION, time.time(), data),
+                    )
+                    connection.execute(
+                        "DELETE FROM entries WHERE key NOT IN "
+                        "(SELECT key FROM entries ORDER BY last_used DESC LIMIT ?)",
+                        (self.max_entries,),
+                    )
+            finally:
+                connection.close()
+        except (sqlite3.Error, pickle.PicklingError) as e:
+            print(f"Parse cache write failed for {key}: {e}")
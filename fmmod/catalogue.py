@@ -0,0 +1,175 @@
+"""Declarative patch catalogue: the patch definitions, read from versioned JSON files.
+
+The built-in patches live in patches.json next to this module. Modders add patches, groups or
+parameters by dropping more catalogue files with the same layout into USER_CATALOGUE_DIR.
+"""
+import os
+import glob
+import json
+
+CATALOGUE_VERSION = 1
+BUILTIN_CATALOGUE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "patches.json")
+USER_CATALOGUE_DIR = "./patches"
+
+loaded_catalogue = None  # The built-in plus user catalogue, loaded on first use by default_catalogue
+
+
+def parse_address(value):
+    return int(value, 0) if isinstance(value, str) else int(value)
+
+
+class PatchCatalogue:
+    """Patch groups and the parameters their bytes depend on, merged from one or more catalogue files.
+
+    A patch is an address patch ("address" and "modified") or a signature patch ("original" and
+    "modified"). A parameterised "modified" is {parameter: {value: hex}}. Resolved groups are cached
+    per set of parameter values, and the matchers compiled from them per set of signatures.
+    """
+
+    def __init__(self):
+        self.parameters = {}  # Maps parameter name to {'label', 'default', 'choices': {value: label}}
+        self.groups = {}  # Maps group key to {'key', 'name', 'patches'}, in the order they are checked and applied
+        self.resolved = {}  # Maps (group key, parameter values) to the group's resolved patches
+        self.scanners = {}  # Maps a frozenset of signatures to its compiled PatchScanner, filled in by the engine
+
+    def add_file(self, path):
+        """Merge a catalogue file in; groups with a known key get the new patches appended."""
+        with open(path, encoding="utf-8") as f:
+            try:
+                catalogue = json.load(f)
+            except ValueError as e:
+                raise ValueError(f"{path}: not valid JSON ({e})")
+        if catalogue.get("version") != CATALOGUE_VERSION:
+            raise ValueError(f"{path}: unsupported catalogue version {catalogue.get('version')}")
+        try:
+            # Everything is parsed before anything is merged, so a bad file leaves the catalogue untouched
+            parameters = {name: dict(parameter) for name, parameter in catalogue.get("parameters", {}).items()}
+            groups = [
+                (group["key"], group.get("name", group["key"]), [self.parse_patch(patch) for patch in group["patches"]])
+                for group in catalogue.get("groups", [])
+            ]
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            raise ValueError(f"{path}: invalid patch definition ({type(e).__name__}: {e})")
+        # Merge into copies and check the result, so a file that would break other groups is rejected here
+        merged_parameters = {name: dict(parameter, choices=dict(parameter['choices'])) for name, parameter in self.parameters.items()}
+        for name, parameter in parameters.items():
+            entry = merged_parameters.setdefault(name, {'label': name, 'default': None, 'choices': {}})
+            entry['label'] = parameter.get("label", entry['label'])
+            entry['choices'].update(parameter.get("choices", {}))
+            if parameter.get("default") is not None:
+                entry['default'] = str(parameter["default"])
+        merged_groups = {key: dict(group, patches=list(group['patches'])) for key, group in self.groups.items()}
+        for key, name, patches in groups:
+            entry = merged_groups.setdefault(key, {'key': key, 'name': name, 'patches': []})
+            entry['patches'].extend(patches)
+        self.check(path, merged_parameters, merged_groups)
+        self.parameters = merged_parameters
+        self.groups = merged_groups
+        self.resolved.clear()
+        self.scanners.clear()
+
+    @staticmethod
+    def check(path, parameters, groups):
+        """Raise ValueError unless every parameter has a valid default and every parameterised patch has bytes for each choice."""
+        for name, parameter in parameters.items():
+            if parameter['default'] not in parameter['choices']:
+                raise ValueError(f"{path}: parameter {name} needs a default that is one of its choices")
+        for group in groups.values():
+            for patch in group['patches']:
+                if not isinstance(patch['modified'], tuple):
+                    continue
+                parameter, choices = patch['modified']
+                if parameter not in parameters:
+                    raise ValueError(f"{path}: {patch['patch_name']} depends on undeclared parameter {parameter}")
+                missing = [value for value in parameters[parameter]['choices'] if value not in choices]
+                if missing:
+                    raise ValueError(f"{path}: {patch['patch_name']} has no bytes for {parameter} {', '.join(missing)}")
+
+    def parse_patch(self, patch):
+        """Check one patch definition and convert its hex strings to bytes."""
+        modified = patch["modified"]
+        if isinstance(modified, dict):
+            if len(modified) != 1:
+                raise ValueError(f"{patch['name']} must depend on exactly one parameter")
+            parameter, values = next(iter(modified.items()))
+            modified = (parameter, {value: bytes.fromhex(data) for value, data in values.items()})
+        else:
+            modified = bytes.fromhex(modified)
+        if "address" in patch:
+            return {'patch_name': patch["name"], 'address': parse_address(patch["address"]), 'modified': modified}
+        original = bytes.fromhex(patch["original"])
+        lengths = {len(data) for data in modified[1].values()} if isinstance(modified, tuple) else {len(modified)}
+        if lengths != {len(original)}:
+            raise ValueError(f"{patch['name']}: modified bytes must be as long as the original signature")
+        return {'patch_name': patch["name"], 'original': original, 'modified': modified}
+
+    def group_names(self):
+        """Return (key, display name) of every group, in the order they are checked and applied."""
+        return [(group['key'], group['name']) for group in self.groups.values()]
+
+    def parameter_values(self, overrides):
+        """Return every parameter's value, taking overrides (None values ignored) over the defaults."""
+        values = {}
+        for name, parameter in self.parameters.items():
+            value = overrides.get(name)
+            value = parameter['default'] if value is None else str(value)
+            if value not in parameter['choices']:
+                raise ValueError(f"{parameter['label']} must be one of {', '.join(parameter['choices'])}")
+            values[name] = value
+        unknown = set(overrides) - set(self.parameters)
+        if unknown:
+            raise ValueError(f"Unknown patch parameter {', '.join(sorted(unknown))}")
+        return values
+
+    def resolve(self, values, group_keys):
+        """Return {group key: patches} for the given groups, with every parameterised value filled in from values."""
+        values_key = tuple(sorted(values.items()))
+        groups = {}
+        for group_key, group in self.groups.items():
+            if group_key not in group_keys:
+                continue
+            patches = self.resolved.get((group_key, values_key))
+            if patches is None:
+                patches = []
+                for patch in group['patches']:
+                    if isinstance(patch['modified'], tuple):
+                        parameter, choices = patch['modified']
+                        patch = dict(patch, modified=choices[values[parameter]])
+                    patches.append(patch)
+                self.resolved[(group_key, values_key)] = patches
+            groups[group_key] = patches
+        return groups
+
+    @staticmethod
+    def signatures(groups):
+        """Return every original and modified signature of resolved groups, which the scanner has to find."""
+        patterns = set()
+        for patches in groups.values():
+            for patch in patches:
+                if 'original' in patch:
+                    patterns.add(patch['original'])
+                    patterns.add(patch['modified'])
+        return frozenset(patterns)
+
+
+def load_catalogue(paths):
+    catalogue = PatchCatalogue()
+    for path in paths:
+        catalogue.add_file(path)
+    return catalogue
+
+
+def default_catalogue():
+    """Return the built-in catalogue merged with every *.json file in USER_CATALOGUE_DIR, loading it once."""
+    global loaded_catalogue
+    if loaded_catalogue is None:
+        catalogue = load_catalogue([BUILTIN_CATALOGUE])
+        for path in sorted(glob.glob(os.path.join(USER_CATALOGUE_DIR, "*.json"))):
+            try:
+                catalogue.add_file(path)
+                print(f"Loaded patch catalogue {path}")
+            except (OSError, ValueError) as e:
+                # A broken user file must not take the built-in patches down with it
+                print(f"Ignoring patch catalogue: {e}")
+        loaded_catalogue = catalogue
+    return loaded_catalogue
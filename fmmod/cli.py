@@ -0,0 +1,267 @@
+"""Command line front end: python -m fmmod {dump,patch,query,reverse,batch} ..."""
+import argparse
+import contextlib
+import json
+import sys
+import time
+
+from .data import ModData
+from .disc import DiscImage
+from .search import SearchIndex
+from .patching import PatchEngine, OUTPUT_MODES
+from .catalogue import default_catalogue
+from .batch import BATCH_MODES, find_images, run_batch
+
+DROP_POOLS = ("deck", "sa_pow", "bcd", "sa_tec")
+
+
+def load_mod(args):
+    """Load the SLUS (and optional WA_MRG) tables named on the command line, or found in --image."""
+    slus_source, wamrg_source = args.slus, args.wamrg
+    if args.image:
+        disc_image = DiscImage(args.image)
+        slus_source = slus_source or disc_image.find_name("SLUS_014.11")
+        wamrg_source = wamrg_source or disc_image.find_name("WA_MRG.MRG")
+    if not slus_source:
+        raise ValueError("no SLUS_014.11: pass --slus or an --image that contains it")
+    mod = ModData(cache_path=args.cache)
+    # The decoders log progress with print(); keep stdout for the command's own output
+    with contextlib.redirect_stdout(sys.stderr):
+        mod.load_slus(slus_source)
+        if wamrg_source:
+            mod.load_wamrg(wamrg_source)
+    return mod
+
+
+def card_record(mod, card_id):
+    """Return everything known about a card as a JSON-friendly dict."""
+    stats = mod.card_stats.get(card_id, {})
+    record = {
+        "id": card_id,
+        "name": mod.card_names.get(card_id, f"Unknown_{card_id}"),
+        "description": mod.card_descriptions.get(card_id, ""),
+        "atk": stats.get("atk"),
+        "def": stats.get("def"),
+        "type": stats.get("type"),
+        "level": stats.get("level"),
+        "attribute": stats.get("attribute"),
+        "guardian_stars": [stats.get("guard_star_1"), stats.get("guard_star_2")],
+    }
+    if mod.wamrg_path:
+        password_cost = mod.card_passwords_and_costs.get(card_id, {"cost": None, "code": "No Password"})
+        record["password"] = password_cost["code"]
+        record["cost"] = password_cost["cost"]
+        record["dropped_by"] = [
+            {"opponent": mod.opponents[opponent_id], "pool": pool, "chance": chance}
+            for opponent_id, pool, chance in (mod.dropper_index.droppers(card_id) if mod.dropper_index else [])
+        ]
+        record["equips"] = [equip_id for equip_id, _ in mod.card_to_equips.get(card_id, [])]
+        record["equips_to"] = mod.equip_to_cards.get(card_id, [])
+        if mod.fusion_table is not None:
+            record["fuses_with"] = {partner: result for partner, result in sorted(mod.fusion_table.fusions_for(card_id).items())}
+            record["fused_from"] = mod.fusion_table.recipes(card_id)
+    return record
+
+
+def dump(args):
+    mod = load_mod(args)
+    if args.table == "cards":
+        data = [card_record(mod, card_id) for card_id in range(1, mod.total_cards + 1)]
+    elif args.table == "opponents":
+        data = [{"id": opponent_id, "name": name} for opponent_id, name in enumerate(mod.opponents)]
+    else:
+        if not mod.wamrg_path:
+            raise SystemExit(f"dump {args.table} needs --wamrg or an --image that contains WA_MRG.MRG")
+        if args.table == "drops":
+            opponent_ids = [args.opponent] if args.opponent is not None else range(1, mod.drop_matrix.opponent_count)
+            # chances() warns about capped weights with print(); keep stdout valid JSON
+            with contextlib.redirect_stdout(sys.stderr):
+                data = [
+                    {
+                        "id": opponent_id,
+                        "name": mod.opponents[opponent_id] if opponent_id < len(mod.opponents) else None,
+                        # Deck weights are shown raw, drop pools capped at 2048 like the viewer does
+                        **{pool: mod.drop_matrix.chances(opponent_id, pool, cap=None if pool == "deck" else 2048) for pool in DROP_POOLS},
+                    }
+                    for opponent_id in opponent_ids
+                ]
+        elif args.table == "equips":
+            data = mod.equip_to_cards
+        else:
+            fusion_table = mod.fusion_table
+            data = [
+                {"materials": list(pair), "result": result}
+                for pair, result in sorted(fusion_table.by_pair.items())
+            ] if fusion_table is not None else []
+    json.dump(data, sys.stdout, indent=args.indent)
+    sys.stdout.write("\n")
+    return 0
+
+
+def query(args):
+    mod = load_mod(args)
+    if args.term.isdigit():
+        card_ids = [int(args.term)] if 1 <= int(args.term) <= mod.total_cards else []
+    else:
+        index = SearchIndex()
+        for card_id in range(1, mod.total_cards + 1):
+            index.add(card_id, (mod.card_names.get(card_id, f"Unknown_{card_id}").lower(),), mod.card_descriptions.get(card_id, "").lower())
+        card_ids = sorted(index.search(args.term, include_description=args.descriptions))
+    records = [card_record(mod, card_id) for card_id in card_ids[:args.limit]]
+    if args.json:
+        json.dump(records, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        for record in records:
+            print(f"{record['id']:>3}  {record['name']}  {record['atk']}/{record['def']}  {record['type']}")
+    if len(card_ids) > args.limit:
+        print(f"... and {len(card_ids) - args.limit} more", file=sys.stderr)
+    return 0 if card_ids else 1
+
+
+def enabled_groups(args):
+    return {key for key, _ in default_catalogue().group_names()} if "all" in args.patch else set(args.patch)
+
+
+def patch_parameters(args):
+    """Return the catalogue parameter values set with --drop-rate and --param NAME=VALUE."""
+    parameters = {}
+    for setting in args.param or ():
+        name, separator, value = setting.partition("=")
+        if not separator:
+            raise ValueError(f"--param expects NAME=VALUE, got {setting}")
+        parameters[name] = value
+    if args.drop_rate is not None:
+        parameters["drop_rate"] = args.drop_rate
+    return parameters
+
+
+def patch(args):
+    engine = PatchEngine()
+    engine.enabled_patches = enabled_groups(args)
+    engine.patch_parameters = patch_parameters(args)
+    engine.force = args.force
+    output_file_path = engine.patch_image(args.image, args.mode)
+    if output_file_path is None:
+        print("No patches need to be applied.")
+    else:
+        print(f"Patched file saved to {output_file_path}")
+    return 0
+
+
+def reverse(args):
+    engine = PatchEngine()
+    image_path, patches = engine.load_journal(args.image)
+    patch_names = sorted({patch['patch_name'] for patch in patches if patch['type'] != 'ecc'})
+    if not patch_names:
+        raise ValueError(f"No patch journal found for {args.image}")
+    if args.list:
+        for name in patch_names:
+            ranges = sum(1 for patch in patches if patch['patch_name'] == name)
+            print(f"{name} ({ranges} ranges)")
+        return 0
+    unknown = set(args.patch or ()) - set(patch_names)
+    if unknown:
+        raise ValueError(f"{image_path} has no journaled {', '.join(sorted(unknown))}")
+    with contextlib.redirect_stdout(sys.stderr):
+        reversed_count, output_file_path = engine.reverse_journal(image_path, set(args.patch or patch_names), "copy" if args.copy else "in_place")
+    print(f"Reversed {reversed_count} ranges in {output_file_path}")
+    return 0
+
+
+def batch(args):
+    image_paths = find_images(args.source)
+    if not image_paths:
+        raise ValueError(f"No images found in {args.source}")
+    enabled_patches = enabled_groups(args)
+    parameters = patch_parameters(args)
+    started = time.perf_counter()
+    statuses = {"patched": 0, "unchanged": 0, "failed": 0}
+    report = open(args.report, "w", encoding="utf-8") if args.report else None
+    try:
+        for result in run_batch(image_paths, enabled_patches, parameters=parameters, force=args.force,
+                                output_mode=args.mode, workers=args.workers):
+            statuses[result["status"]] += 1
+            if result["status"] == "failed":
+                print(f"failed     {result['image']}: {result['error']}")
+            else:
+                print(f"{result['status']:<10} {result['image']} ({result['ranges']} ranges, {result['seconds']} s)")
+            for warning in result["warnings"]:
+                print(f"           {warning}")
+            if report:
+                report.write(json.dumps(result) + "\n")
+                report.flush()  # Keep the report current while the rest of the batch runs
+    finally:
+        if report:
+            report.close()
+    print(f"Patched {statuses['patched']}, unchanged {statuses['unchanged']}, failed {statuses['failed']} "
+          f"of {len(image_paths)} images in {time.perf_counter() - started:.1f} s")
+    return 1 if statuses["failed"] else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="fmmod", description="Inspect and patch Yu-Gi-Oh! Forbidden Memories mods.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    with contextlib.redirect_stdout(sys.stderr):
+        catalogue = default_catalogue()  # User catalogues can add patch groups and parameter values
+    group_choices = [key for key, _ in catalogue.group_names()] + ["all"]
+    drop_rate_choices = list(catalogue.parameters["drop_rate"]["choices"])
+
+    def add_patch_arguments(command):
+        command.add_argument("--patch", action="append", required=True, choices=group_choices)
+        command.add_argument("--drop-rate", choices=drop_rate_choices, help="shortcut for --param drop_rate=VALUE")
+        command.add_argument("--param", action="append", metavar="NAME=VALUE", help="set a patch catalogue parameter")
+
+    def add_source_arguments(command):
+        command.add_argument("--slus", help="path to SLUS_014.11")
+        command.add_argument("--image", help="ISO/BIN image to read SLUS_014.11 and WA_MRG.MRG from")
+        command.add_argument("--wamrg", help="path to WA_MRG.MRG")
+        command.add_argument("--cache", default="./cache/parse_cache.sqlite3", help="parse cache database")
+
+    dump_command = commands.add_parser("dump", help="write a decoded table as JSON")
+    add_source_arguments(dump_command)
+    dump_command.add_argument("table", choices=("cards", "opponents", "drops", "equips", "fusions"))
+    dump_command.add_argument("--opponent", type=int, help="only dump this opponent's drops")
+    dump_command.add_argument("--indent", type=int, default=None)
+    dump_command.set_defaults(func=dump)
+
+    query_command = commands.add_parser("query", help="look up cards by ID or name")
+    add_source_arguments(query_command)
+    query_command.add_argument("term", help="card ID or part of a name")
+    query_command.add_argument("--descriptions", action="store_true", help="also match descriptions")
+    query_command.add_argument("--limit", type=int, default=20)
+    query_command.add_argument("--json", action="store_true", help="print full card records as JSON")
+    query_command.set_defaults(func=query)
+
+    patch_command = commands.add_parser("patch", help="apply patches to an ISO/BIN image")
+    patch_command.add_argument("image", help="ISO/BIN image to patch")
+    add_patch_arguments(patch_command)
+    patch_command.add_argument("--mode", choices=OUTPUT_MODES, default="copy")
+    patch_command.add_argument("--force", action="store_true", help="reapply patches that already look applied")
+    patch_command.set_defaults(func=patch)
+
+    reverse_command = commands.add_parser("reverse", help="undo journaled patches of a patched image")
+    reverse_command.add_argument("image", help="patched ISO/BIN image, or the original next to its _Patched copy")
+    reverse_command.add_argument("--patch", action="append", help="patch name to reverse (default: all)")
+    reverse_command.add_argument("--copy", action="store_true", help="write a _Reversed copy instead of reversing in place")
+    reverse_command.add_argument("--list", action="store_true", help="list the journaled patches and exit")
+    reverse_command.set_defaults(func=reverse)
+
+    batch_command = commands.add_parser("batch", help="patch every image in a directory or manifest on a process pool")
+    batch_command.add_argument("source", help="directory of .iso/.bin images, or a manifest listing one image path per line")
+    add_patch_arguments(batch_command)
+    batch_command.add_argument("--mode", choices=BATCH_MODES, default="clone")
+    batch_command.add_argument("--force", action="store_true", help="reapply patches that already look applied")
+    batch_command.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    batch_command.add_argument("--report", help="write one JSON line per image to this file")
+    batch_command.set_defaults(func=batch)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except (OSError, ValueError) as e:
+        print(f"fmmod {args.command}: {e}", file=sys.stderr)
+        return 1
@@ -0,0 +1,366 @@
+"""Headless loading of a mod's SLUS_014.11 and WA_MRG.MRG tables."""
+import sys
+import traceback
+from array import array
+
+from .text import CHAR_MAP, TextCodec
+from .tables import CardStatTable, DropMatrix, DropperIndex
+from .fusion import FusionTable, FusionSolver
+from .cache import ParseCache
+from .disc import open_source
+
+
+class ModData:
+    """Decoded card, opponent, drop, equip and fusion tables of a Forbidden Memories mod."""
+
+    # Attributes filled by the SLUS and WA_MRG decoders, in the form stored in the parse cache
+    slus_table_names = ("opponents", "card_names", "card_descriptions", "card_types_map", "guardian_stars_map", "card_stats")
+    wamrg_table_names = ("drop_matrix", "dropper_index", "card_passwords_and_costs", "card_to_equips", "equip_to_cards", "fusion_table")
+
+    def __init__(self, cache_path="./cache/parse_cache.sqlite3"):
+        self.wamrg_path = None # Path to WAMRG.MRG or WAMRG.DAT
+        self.slus_path = None # Path to SLUS_014.11
+        self.card_names = {} # Maps card_id to name
+        self.card_descriptions = {} # Maps card_id to description
+        self.card_stats = {}  # Maps card_id to ATK/DEF/Type/etc., a CardStatTable once SLUS is loaded
+        self.dropper_index = None # DropperIndex mapping card_id to the opponents who drop it
+        self.drop_matrix = None # DropMatrix of every opponent's deck and drop weights
+        self.card_passwords_and_costs = {}  # Maps card_id to (password, cost)
+        self.card_to_equips = {} # Maps card_id to list of equip cards
+        self.equip_to_cards = {} # Maps equip card_id to the list of cards it can be equipped to
+        self.fusion_table = None # FusionTable indexed by material pair and by result
+        self.char_map = CHAR_MAP
+        self.text_codec = TextCodec(self.char_map)
+        self.opponents = []
+        self.total_opponents = 40
+        self.total_cards = 722
+
+        self.card_attributes_map = {
+            0x00: "Light",
+            0x01: "Dark",
+            0x02: "Earth",
+            0x03: "Water",
+            0x04: "Fire",
+            0x05: "Wind",
+            0x06: "Spell",
+            0x07: "Trap",
+            0x08: "Divine",
+        }
+        # Offsets for deck and drop data in WA_MRG.MRG
+        self.wamrg_offsets = {
+            "deck": 0x0000,
+            "sa_pow_drops": 0x05B4,
+            "bcd_drops": 0x0B68,
+            "sa_tec_drops": 0x111C,
+        }
+        self.guardian_stars_map = {}
+        self.data_size = 1460
+        self.opponent_block_size = 0x1800
+
+        # Known game info offsets
+        self.game_info_offsets = {
+            "types_start": 0x1C93D0,
+            "guardian_stars_start": 0x1C9380,
+            "opponents_start": 0x1C92CE, 
+            "locations_start": 0x1C959A,
+            "scrambled_data_start": 0x1C9804,
+            "scrambled_data_end": 0x1C98CB,
+            "card_desc_pointers_start": 0x1B0A00,
+            "card_desc_text_base": 0x1B0800,
+        }
+
+        self.card_types_map = {
+            0x01: "Warrior",
+            0x02: "Spellcaster",
+            0x03: "Fairy",
+            0x04: "Fiend",
+            0x05: "Dragon",
+            0x06: "Zombie",
+            0x07: "Machine",
+            0x08: "Aqua",
+            0x09: "Pyro",
+            0x0A: "Spellcaster",
+            0x0B: "Thunder",
+            0x0C: "Dinosaur",
+            0x0D: "Rock",
+            0x0E: "Winged Beast",
+            0x0F: "Plant",
+            0x10: "Insect",
+            0x11: "Beast",
+            0x12: "Beast-Warrior",
+            0x13: "Reptile",
+            0x14: "Fish",
+            0x15: "Sea Serpent",
+            0x16: "Spell",
+            0x17: "Trap",
+            0x18: "Ritual",
+            0x00: "Unknown"
+        }
+
+        # Decoded SLUS/WA_MRG tables, reused when the same mod is opened again
+        self.parse_cache = ParseCache(cache_path)
+        self.slus_digest = None
+
+    def load_slus(self, slus_path):
+        """Decode every SLUS table, or restore them from the parse cache."""
+        self.slus_path = slus_path
+        with open_source(slus_path) as f:
+            slus_data = f.read()
+        self.slus_digest = ParseCache.digest(slus_data)
+        cache_key = f"slus:{self.slus_digest}"
+        cached_tables = self.parse_cache.get(cache_key)
+        if cached_tables is not None:
+            self.restore_tables(cached_tables)
+            print(f"Loaded SLUS tables from cache ({cache_key})")
+            return
+        self.load_opponent_names(slus_data)
+        self.load_card_names(slus_data)
+        self.load_card_descriptions(slus_data)
+        self.load_type_guardian_star_names(slus_data)
+        self.load_card_stats(slus_data)
+        self.parse_cache.put(cache_key, self.collect_tables(self.slus_table_names))
+
+    def load_wamrg(self, wamrg_path):
+        """Decode the WA_MRG drop, password, equip and fusion tables, or restore them from the parse cache."""
+        self.wamrg_path = wamrg_path
+        # Droppers and equips are labelled with SLUS names, so the SLUS digest is part of the key
+        cache_key = f"wamrg:{ParseCache.file_digest(wamrg_path)}:{self.slus_digest}"
+        cached_tables = self.parse_cache.get(cache_key)
+        if cached_tables is not None:
+            self.restore_tables(cached_tables)
+            print(f"Loaded WA_MRG tables from cache ({cache_key})")
+            return
+        self.load_drop_matrix()
+        self.precompute_card_droppers()
+        self.load_card_passwords_and_costs()
+        self.card_to_equips = self.reverse_lookup_equips(wamrg_path)
+        self.load_fusion_table()
+        self.parse_cache.put(cache_key, self.collect_tables(self.wamrg_table_names))
+
+    def collect_tables(self, table_names):
+        return {name: getattr(self, name) for name in table_names}
+
+    def restore_tables(self, tables):
+        for name, value in tables.items():
+            setattr(self, name, value)
+
+    def load_opponent_names(self, slus_data): 
+        pointer_base = 0x1C6650
+        text_base = 0x1C0800
+        expected_opponents = 40
+        max_length = 50
+
+        # Names stop at 0xFF (terminator) or 0xFD (start of garbled/extra data)
+        names = self.text_codec.decode_table(slus_data, pointer_base, text_base, expected_opponents, max_length, TextCodec.OPPONENTS)
+        self.opponents = [name.strip().title() if name else f"Unknown_{opponent_id}" for opponent_id, name in enumerate(names)]
+        print(f"Loaded {len(self.opponents)} opponent names from SLUS file")
+
+    def load_card_names(self, slus_data):
+        self.card_names.clear()
+        pointer_base = 0x1C6000  # Updated as per user fix
+        text_base = 0x1C0800
+        max_length = 100
+
+        # Skip the first pointer as a placeholder; card IDs start at 1
+        names = self.text_codec.decode_table(slus_data, pointer_base + 2, text_base, self.total_cards, max_length, TextCodec.NAMES)
+        for card_id, name in enumerate(names, start=1):
+            self.card_names[card_id] = name.strip().title() if name else f"Unknown_{card_id}"
+
+        print(f"Loaded {len(self.card_names)} card names from SLUS file")
+
+    def load_card_descriptions(self, slus_data):
+        """Load card descriptions from SLUS data using pointers."""
+        self.card_descriptions.clear()
+        pointer_base = self.game_info_offsets["card_desc_pointers_start"]
+        text_base = self.game_info_offsets["card_desc_text_base"]
+        max_length = 200
+
+        # Start at 0x1B0A02; 0xF8/0xD5/0xFC codes and their parameter are skipped, 0xFE becomes a space
+        descriptions = self.text_codec.decode_table(slus_data, pointer_base + 2, text_base, self.total_cards, max_length, TextCodec.DESCRIPTIONS)
+        for card_id, desc in enumerate(descriptions, start=1):
+            # Post-process corrections
+            desc = desc.replace("388", "300")  # Correct data error
+            desc = desc.replace("bye", "by")   # Fix mapping misread
+            self.card_descriptions[card_id] = desc.strip() if desc else f"Unknown_{card_id}"
+
+        print(f"Loaded {len(self.card_descriptions)} card descriptions from SLUS file")
+
+    def load_type_guardian_star_names(self, slus_data):
+        """Load Type and Guardian Star names using pointers at 0x1C6600."""
+        pointer_base = 0x1C6600
+        text_base = 0x1C0800
+        num_type_pointers = 24  # 48 bytes = 24 pointers
+        num_guardian_star_pointers = 10  # 20 bytes = 10 pointers
+        max_length = 50
+
+        # Load Types, skipping 0xF8 formatting codes wherever they appear
+        print(f"Loading Type names using pointers at {hex(pointer_base)}")
+        type_names = self.text_codec.decode_table(slus_data, pointer_base, text_base, num_type_pointers, max_length, TextCodec.LABELS)
+        self.card_types_map = {
+            type_id: name.strip().title() if name else f"Unknown Type {type_id}"
+            for type_id, name in enumerate(type_names)
+        }
+
+        # Load Guardian Stars
+        pointer_base += num_type_pointers * 2  # Move to Guardian Star pointers
+        star_names = self.text_codec.decode_table(slus_data, pointer_base, text_base, num_guardian_star_pointers, max_length, TextCodec.LABELS)
+        self.guardian_stars_map = {
+            gs_id + 1: name.strip().title() if name else f"Unknown Guardian Star {gs_id}"  # Shifted IDs (1-10)
+            for gs_id, name in enumerate(star_names)
+        }
+
+        pointer_base += num_guardian_star_pointers * 2
+        print(f"Skipping unused pointers at {hex(pointer_base)} (6 bytes)")
+
+    def load_card_stats(self, slus_data):
+        """Load card ATK, DEF, Type, Guard Stars, and Attribute from SLUS_014.11."""
+        offset_stats = 0x1C4A42
+        offset_levels = 0x1C5B33
+
+        print(f"Loading card stats starting at offset {hex(offset_stats)} and levels at {hex(offset_levels)}")
+        # Use bytes 2-5 of each 4-byte slot for stats (a4f10402 for Card 1)
+        self.card_stats = CardStatTable(
+            slus_data, self.total_cards, offset_stats + 2, offset_levels,
+            self.card_types_map, self.guardian_stars_map, self.card_attributes_map
+        )
+
+        # Debug print for specific cards
+        for card_id in (1, self.total_cards):
+            if card_id in self.card_stats:
+                stats = self.card_stats[card_id]
+                print(f"Card {card_id}: ATK = {stats['atk']}, DEF = {stats['def']}, Type = {stats['type']}, "
+                      f"Guard Star 1 = {stats['guard_star_1']}, Guard Star 2 = {stats['guard_star_2']}, "
+                      f"Attribute = {stats['attribute']}, Level = {stats['level']}")
+
+        print(f"Loaded stats for {len(self.card_stats)} cards from SLUS file")
+
+    def load_drop_matrix(self):
+        """Read every opponent's deck and drop pools from WA_MRG with a single read."""
+        self.drop_matrix = DropMatrix.from_file(
+            self.wamrg_path, 0xE99800, self.total_opponents, self.total_cards, self.opponent_block_size,
+            [self.wamrg_offsets[key] for key in ("deck", "sa_pow_drops", "bcd_drops", "sa_tec_drops")]
+        )
+        print(f"Loaded drop matrix for {self.drop_matrix.opponent_count} opponents from WAMRG file")
+
+    def precompute_card_droppers(self):
+        """Precompute which opponents drop each card for reverse lookup."""
+        self.dropper_index = DropperIndex(self.drop_matrix, len(self.opponents))
+
+    def load_card_passwords_and_costs(self):
+        """Load card passwords and starchip costs from WA_MRG.MRG at offset 0xFB9808."""
+        if not self.wamrg_path:
+            print("No WAMRG file loaded. Cannot load card passwords and costs.")
+            return
+
+        self.card_passwords_and_costs.clear()
+        offset = 0xFB9808
+        bytes_per_card = 8
+
+        try:
+            with open_source(self.wamrg_path) as f:
+                for card_id in range(1, self.total_cards + 1):
+                    f.seek(offset + (card_id - 1) * bytes_per_card)
+                    data = f.read(bytes_per_card)
+                    if len(data) != bytes_per_card:
+                        print(f"Reached end of file at card {card_id}. Expected {bytes_per_card} bytes, got {len(data)}.")
+                        break
+
+                    # Parse cost (first 4 bytes, little-endian)
+                    cost = int.from_bytes(data[0:4], 'little')
+                    # Parse code (last 4 bytes, little-endian)
+                    code = int.from_bytes(data[4:8], 'little')
+
+                    # Store the data
+                    self.card_passwords_and_costs[card_id] = {
+                        "cost": cost,
+                        "code": "No Password" if code == 0xFFFFFFFE else f"{code:08d}"  # Format as 8-digit string or "No Password"
+                    }
+                    # Debug print for specific cards
+                    #if card_id in [1, 2, 3, 4]:
+                        #print(f"Card {card_id}: Cost = {cost} starchips, Code = {self.card_passwords_and_costs[card_id]['code']}, Bytes = {binascii.hexlify(data)}")
+
+        except Exception as e:
+            print(f"Failed to load card passwords and costs: {e}")
+            traceback.print_exc()
+
+    def load_equip_table(self, wamrg_path):
+        """Read the seven field equip regions in bulk and return their (equip_id, [material card_id, ...]) records."""
+        equip_offsets = {
+            0: (0xB85000, 0xB87800),  # No Field
+            1: (0xBFA800, 0xBFD000),  # Forest Field
+            2: (0xC70000, 0xC72800),  # Wasteland Field
+            3: (0xCE5800, 0xCE8000),  # Mountain Field
+            4: (0xD5B000, 0xD5D800),  # Sogen Field
+            5: (0xDD0800, 0xDD3000),  # Umi Field
+            6: (0xE46000, 0xE48800)   # Yami Field
+        }
+        records = []
+
+        with open_source(wamrg_path) as f:
+            for field_type, (start_offset, end_offset) in equip_offsets.items():
+                f.seek(start_offset)
+                region = f.read(end_offset - start_offset)
+                words = array('H', region[:len(region) // 2 * 2])
+                if sys.byteorder == 'big':
+                    words.byteswap()
+                # Records are: equip card ID, total number of cards, then that many material card IDs
+                i = 0
+                while i < len(words):
+                    equip_id = words[i]
+                    if equip_id == 0:
+                        break  # End of equip data for this field
+                    total_cards = words[i + 1] if i + 1 < len(words) else 0
+                    # Skip null entries
+                    records.append((equip_id, [card_id for card_id in words[i + 2:i + 2 + total_cards] if card_id != 0]))
+                    i += 2 + total_cards
+
+        return records
+
+    def reverse_lookup_equips(self, wamrg_path): #this is a function to show which equips a card can use
+        """Reverse lookup to find all equips a monster (card) can use based on equip data."""
+        try:
+            records = self.load_equip_table(wamrg_path)
+        except Exception as e:
+            print(f"Error processing equip data: {e}")
+            self.equip_to_cards = {}
+            return {}
+
+        # Dicts used as ordered sets keep first-seen order with O(1) deduplication
+        card_to_equips = {}  # Map card ID to (equip_id, equip_name) tuples
+        equip_to_cards = {}  # Map equip ID to the material card IDs it can be equipped to
+        for equip_id, material_cards in records:
+            equip_name = self.card_names.get(equip_id, f"Unknown_{equip_id}")
+            targets = equip_to_cards.setdefault(equip_id, {})
+            for card_id in material_cards:
+                targets[card_id] = None
+                card_to_equips.setdefault(card_id, {})[(equip_id, equip_name)] = None
+
+        self.equip_to_cards = {equip_id: list(card_ids) for equip_id, card_ids in equip_to_cards.items()}
+        return {card_id: list(equips) for card_id, equips in card_to_equips.items()}
+
+    def load_fusion_table(self):
+        """Decode the No Field fusion table, which directly follows the No Field equip region."""
+        try:
+            self.fusion_table = FusionTable.from_file(self.wamrg_path, 0xB87800, self.total_cards)
+            print(f"Loaded {len(self.fusion_table)} fusions from WAMRG file")
+        except Exception as e:
+            print(f"Error processing fusion data: {e}")
+            self.fusion_table = None
+
+    def simulate_opponent_fusions(self, opponent_id, samples=1000):
+        """Sample opening hands from an opponent's deck and return (average best fusion ATK, {result: count})."""
+        if self.fusion_table is None or self.drop_matrix is None:
+            return 0, {}
+        solver = FusionSolver(self.fusion_table, self.card_stats, self.total_cards)
+        return solver.evaluate_deck(self.drop_matrix.chances(opponent_id, "deck"), samples)
+
+    def parse_deck(self, data):
+        chances = {}
+        for card_id in range(1, self.total_cards + 1):
+            idx = (card_id - 1) * 2
+            if idx + 2 > len(data):
+                break
+            chance = int.from_bytes(data[idx:idx + 2], 'little')
+            if chance > 0:
+                chances[card_id] = chance
+        return chances
@@ -0,0 +1,306 @@
+"""Delta patch formats (PPF3, IPS, BPS) built from and applied to ISO/BIN images."""
+import os
+import struct
+import zlib
+
+DELTA_CHUNK_SIZE = 4 * 1024 * 1024
+PPF_BLOCKCHECK_OFFSETS = {0: 0x9320, 1: 0x80A0}  # Image type 0 = BIN, 1 = GI
+IPS_MAX_OFFSET = 0xFFFFFF
+
+
+def delta_records_from_journal(applied_patches):
+    """Merge journaled patches into sorted, contiguous (offset, original, modified) records."""
+    records = []
+    for patch in sorted(applied_patches, key=lambda patch: patch.get('offset', patch.get('address'))):
+        offset = patch.get('offset', patch.get('address'))
+        original, modified = bytes(patch['original']), bytes(patch['modified'])
+        if records and records[-1][0] + len(records[-1][2]) == offset:
+            last_offset, last_original, last_modified = records[-1]
+            records[-1] = (last_offset, last_original + original, last_modified + modified)
+        else:
+            records.append((offset, original, modified))
+    return records
+
+
+def overlay_records(chunk, position, records, first=0):
+    """Copy the parts of sorted (offset, data) records that fall in chunk, which starts at position.
+
+    Returns the index of the first record that can still reach a later chunk.
+    """
+    end = position + len(chunk)
+    while first < len(records) and records[first][0] + len(records[first][1]) <= position:
+        first += 1
+    index = first
+    while index < len(records) and records[index][0] < end:
+        offset, data = records[index]
+        start, stop = max(offset, position), min(offset + len(data), end)
+        if start < stop:
+            chunk[start - position:stop - position] = data[start - offset:stop - offset]
+        index += 1
+    return first
+
+
+def iter_patched_chunks(source_file, records, target_size, chunk_size=DELTA_CHUNK_SIZE):
+    """Stream source_file with (offset, data) records overlaid, yielding target_size bytes in order."""
+    records = sorted(records, key=lambda record: record[0])
+    first = 0
+    position = 0
+    while position < target_size:
+        wanted = min(chunk_size, target_size - position)
+        chunk = bytearray(source_file.read(wanted))
+        chunk.extend(bytes(wanted - len(chunk)))  # Records may extend past the end of the source
+        first = overlay_records(chunk, position, records, first)
+        yield chunk
+        position += wanted
+
+
+def write_ppf3_patch(patch_path, records, source_path, description="FM Mod Viewer patch"):
+    """Write records as a PPF3 patch with undo data and a block check of the source image."""
+    with open(source_path, 'rb') as source:
+        source.seek(PPF_BLOCKCHECK_OFFSETS[0])
+        blockcheck = source.read(1024)
+    if len(blockcheck) != 1024:
+        blockcheck = b""
+
+    with open(patch_path, 'wb') as f:
+        f.write(b"PPF30" + bytes([2]))
+        f.write(description.encode('ascii', 'replace')[:50].ljust(50, b" "))
+        f.write(bytes([0, 1 if blockcheck else 0, 1, 0]))  # BIN image, block check, undo data, padding
+        f.write(blockcheck)
+        for offset, original, modified in records:
+            # PPF records hold at most 255 bytes
+            for start in range(0, len(modified), 255):
+                f.write(struct.pack('<QB', offset + start, len(modified[start:start + 255])))
+                f.write(modified[start:start + 255])
+                f.write(original[start:start + 255])
+
+
+def read_ppf3_patch(data):
+    """Parse a PPF3 patch into (records, blockcheck offset, blockcheck bytes)."""
+    if data[:5] != b"PPF30" or data[5] != 2:
+        raise ValueError("Not a PPF3 patch")
+    image_type, has_blockcheck, has_undo = data[56], data[57], data[58]
+    position = 60
+    blockcheck = b""
+    if has_blockcheck:
+        blockcheck = data[position:position + 1024]
+        position += 1024
+    end = len(data)
+    diz_start = data.rfind(b"@BEGIN_FILE_ID.DIZ")
+    if diz_start != -1 and b"@END_FILE_ID.DIZ" in data[diz_start:]:
+        end = diz_start
+    records = []
+    while position + 9 <= end:
+        offset, length = struct.unpack_from('<QB', data, position)
+        position += 9
+        records.append((offset, data[position:position + length]))
+        position += length * (2 if has_undo else 1)
+    return records, PPF_BLOCKCHECK_OFFSETS.get(image_type, PPF_BLOCKCHECK_OFFSETS[0]), blockcheck
+
+
+def check_ips_reach(records):
+    """Raise ValueError if any (offset, original, modified) record ends beyond the 24-bit offsets of IPS."""
+    for offset, _, modified in records:
+        if offset + len(modified) > IPS_MAX_OFFSET:
+            raise ValueError(f"Offset {hex(offset)} is beyond the 16 MiB reach of IPS; use PPF or BPS instead")
+
+
+def write_ips_patch(patch_path, records, source_path):
+    """Write records as an IPS patch; IPS offsets are 24-bit, so the image patches must sit below 16 MiB."""
+    check_ips_reach(records)  # Before opening patch_path, so a patch that cannot be written leaves no file behind
+    with open(patch_path, 'wb') as f, open(source_path, 'rb') as source:
+        f.write(b"PATCH")
+        for offset, _, modified in records:
+            if offset == 0x454F46:
+                # An offset spelling "EOF" would end the patch early, so start one byte sooner
+                source.seek(offset - 1)
+                offset, modified = offset - 1, source.read(1) + modified
+            for start in range(0, len(modified), 0xFFFF):
+                piece = modified[start:start + 0xFFFF]
+                f.write((offset + start).to_bytes(3, 'big') + len(piece).to_bytes(2, 'big') + piece)
+        f.write(b"EOF")
+
+
+def read_ips_patch(data):
+    """Parse an IPS patch into (records, truncate size or None)."""
+    if data[:5] != b"PATCH":
+        raise ValueError("Not an IPS patch")
+    position = 5
+    records = []
+    while data[position:position + 3] != b"EOF":
+        if position + 5 > len(data):
+            raise ValueError("IPS patch is truncated")
+        offset = int.from_bytes(data[position:position + 3], 'big')
+        size = int.from_bytes(data[position + 3:position + 5], 'big')
+        position += 5
+        if size == 0:
+            # RLE record: 2-byte run length and the byte to repeat
+            run_length = int.from_bytes(data[position:position + 2], 'big')
+            records.append((offset, data[position + 2:position + 3] * run_length))
+            position += 3
+        else:
+            records.append((offset, data[position:position + size]))
+            position += size
+    position += 3
+    truncate = int.from_bytes(data[position:position + 3], 'big') if len(data) >= position + 3 else None
+    return records, truncate
+
+
+def encode_bps_number(value):
+    encoded = bytearray()
+    while True:
+        low = value & 0x7F
+        value >>= 7
+        if value == 0:
+            encoded.append(0x80 | low)
+            return bytes(encoded)
+        encoded.append(low)
+        value -= 1
+
+
+def decode_bps_number(data, position):
+    value, shift = 0, 1
+    while True:
+        byte = data[position]
+        position += 1
+        value += (byte & 0x7F) * shift
+        if byte & 0x80:
+            return value, position
+        shift <<= 7
+        value += shift
+
+
+def write_bps_patch(patch_path, records, source_path, metadata=b""):
+    """Write records as a BPS patch, computing source and target CRC32s in one streaming pass."""
+    source_size = os.path.getsize(source_path)
+    source_crc = target_crc = 0
+    overlay = sorted(((offset, modified) for offset, _, modified in records), key=lambda record: record[0])
+    first = 0
+    position = 0
+    with open(source_path, 'rb') as source:
+        # Each chunk is checksummed as read, then again with the records laid over it
+        for chunk in iter(lambda: bytearray(source.read(DELTA_CHUNK_SIZE)), b""):
+            source_crc = zlib.crc32(chunk, source_crc)
+            first = overlay_records(chunk, position, overlay, first)
+            target_crc = zlib.crc32(chunk, target_crc)
+            position += len(chunk)
+
+    patch = bytearray(b"BPS1")
+    patch += encode_bps_number(source_size) + encode_bps_number(source_size)
+    patch += encode_bps_number(len(metadata)) + metadata
+    output_offset = 0
+    for offset, _, modified in records:
+        if offset > output_offset:
+            patch += encode_bps_number(((offset - output_offset - 1) << 2) | 0)  # SourceRead
+        patch += encode_bps_number(((len(modified) - 1) << 2) | 1) + modified  # TargetRead
+        output_offset = offset + len(modified)
+    if output_offset < source_size:
+        patch += encode_bps_number(((source_size - output_offset - 1) << 2) | 0)
+    patch += struct.pack('<II', source_crc, target_crc)
+    patch += struct.pack('<I', zlib.crc32(patch))
+    with open(patch_path, 'wb') as f:
+        f.write(patch)
+
+
+def apply_bps_patch(data, source_path, output_path):
+    """Apply a BPS patch, reading the source sequentially and verifying all three CRC32s."""
+    if data[:4] != b"BPS1":
+        raise ValueError("Not a BPS patch")
+    if zlib.crc32(data[:-4]) != struct.unpack_from('<I', data, len(data) - 4)[0]:
+        raise ValueError("BPS patch is corrupt (patch checksum mismatch)")
+    source_size, position = decode_bps_number(data, 4)
+    target_size, position = decode_bps_number(data, position)
+    metadata_size, position = decode_bps_number(data, position)
+    position += metadata_size
+    expected_source_crc, expected_target_crc = struct.unpack_from('<II', data, len(data) - 12)
+    if os.path.getsize(source_path) != source_size:
+        raise ValueError("BPS patch does not match this image (size mismatch)")
+
+    source_crc = target_crc = 0
+    source_cursor = 0
+    output_offset = 0
+    source_relative = target_relative = 0
+    with open(source_path, 'rb') as source, open(source_path, 'rb') as source_random, open(output_path, 'w+b') as output:
+        def read_source_until(stop, keep=True):
+            # Advance the sequential cursor, checksumming every source byte exactly once
+            nonlocal source_cursor, source_crc
+            pieces = []
+            while source_cursor < stop:
+                piece = source.read(min(DELTA_CHUNK_SIZE, stop - source_cursor))
+                if not piece:
+                    raise ValueError("BPS patch reads past the end of the source image")
+                source_crc = zlib.crc32(piece, source_crc)
+                source_cursor += len(piece)
+                if keep:
+                    pieces.append(piece)
+            return b"".join(pieces)
+
+        def write_target(piece):
+            nonlocal output_offset, target_crc
+            output.write(piece)
+            target_crc = zlib.crc32(piece, target_crc)
+            output_offset += len(piece)
+
+        while position < len(data) - 12:
+            command, position = decode_bps_number(data, position)
+            action, length = command & 3, (command >> 2) + 1
+            if action == 0:  # SourceRead
+                read_source_until(output_offset, keep=False)
+                for start in range(0, length, DELTA_CHUNK_SIZE):
+                    write_target(read_source_until(output_offset + min(DELTA_CHUNK_SIZE, length - start)))
+            elif action == 1:  # TargetRead
+                write_target(data[position:position + length])
+                position += length
+            else:
+                relative, position = decode_bps_number(data, position)
+                relative = -(relative >> 1) if relative & 1 else relative >> 1
+                if action == 2:  # SourceCopy
+                    source_relative += relative
+                    source_random.seek(source_relative)
+                    write_target(source_random.read(length))
+                    source_relative += length
+                else:  # TargetCopy, which may overlap the bytes it is producing
+                    target_relative += relative
+                    while length:
+                        output.seek(target_relative)
+                        piece = output.read(min(length, output_offset - target_relative))
+                        output.seek(output_offset)
+                        write_target(piece)
+                        target_relative += len(piece)
+                        length -= len(piece)
+        read_source_until(source_size, keep=False)
+
+    if source_crc != expected_source_crc:
+        raise ValueError("BPS patch does not match this image (source checksum mismatch)")
+    if output_offset != target_size or target_crc != expected_target_crc:
+        raise ValueError("BPS output checksum mismatch")
+
+
+def apply_delta_patch(patch_path, source_path, output_path):
+    """Apply a PPF3, IPS or BPS patch to source_path, streaming the output in one sequential pass."""
+    with open(patch_path, 'rb') as f:
+        data = f.read()
+    if data[:4] == b"BPS1":
+        apply_bps_patch(data, source_path, output_path)
+        return
+
+    source_size = os.path.getsize(source_path)
+    target_size = source_size
+    if data[:5] == b"PPF30":
+        records, blockcheck_offset, blockcheck = read_ppf3_patch(data)
+        if blockcheck:
+            with open(source_path, 'rb') as source:
+                source.seek(blockcheck_offset)
+                if source.read(1024) != blockcheck:
+                    raise ValueError("PPF patch does not match this image (block check failed)")
+    elif data[:5] == b"PATCH":
+        records, truncate = read_ips_patch(data)
+        target_size = max([source_size] + [offset + len(piece) for offset, piece in records])
+        if truncate is not None:
+            target_size = truncate
+    else:
+        raise ValueError("Unrecognised patch format (expected PPF3, IPS or BPS)")
+
+    with open(source_path, 'rb') as source, open(output_path, 'wb') as output:
+        for chunk in iter_patched_chunks(source, records, target_size):
+            output.write(chunk)
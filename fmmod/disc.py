@@ -0,0 +1,219 @@
+"""Read-only ISO9660 access to 2048-byte ISOs and raw 2352-byte BIN images."""
+import io
+import mmap
+
+SECTOR_SIZE = 2048  # User data bytes per sector
+RAW_SECTOR_SIZE = 2352  # Sync, header, (Mode 2) subheader, user data and EDC/ECC
+SYNC_PATTERN = b"\x00" + b"\xff" * 10 + b"\x00"
+PVD_SECTOR = 16  # The primary volume descriptor follows the 16 system area sectors
+
+
+def sector_layout(data):
+    """Return (sector size, user data offset) of an image: (2048, 0) for an ISO, (2352, 16 or 24) for a raw BIN."""
+    if len(data) >= RAW_SECTOR_SIZE and data[:12] == SYNC_PATTERN:
+        # Byte 15 of the header is the sector mode; Mode 2 Form 1 data follows an 8-byte subheader
+        probe = PVD_SECTOR * RAW_SECTOR_SIZE if len(data) >= (PVD_SECTOR + 1) * RAW_SECTOR_SIZE else 0
+        return RAW_SECTOR_SIZE, 24 if data[probe + 15] == 2 else 16
+    return SECTOR_SIZE, 0
+
+
+def raw_offset(offset, sector_size, data_offset):
+    """Map an offset into an image's concatenated user data to its raw byte offset."""
+    sector, position = divmod(offset, SECTOR_SIZE)
+    return sector * sector_size + data_offset + position
+
+
+def raw_segments(offset, length, sector_size, data_offset):
+    """Split length user data bytes starting at a raw offset into (raw offset, length) runs, one per sector."""
+    if sector_size == SECTOR_SIZE:
+        return [(offset, length)]
+    segments = []
+    while length > 0:
+        sector_start = offset - offset % sector_size
+        run = min(length, sector_start + data_offset + SECTOR_SIZE - offset)
+        segments.append((offset, run))
+        length -= run
+        offset = sector_start + sector_size + data_offset  # The next sector's user data
+    return segments
+
+
+def open_source(source):
+    """Open a file path, or a DiscFile inside an image, for binary reading."""
+    if isinstance(source, DiscFile):
+        return source.open()
+    return open(source, 'rb')
+
+
+class DiscFile:
+    """A file or directory extent on a DiscImage. Decoders accept it anywhere they take a file path."""
+
+    def __init__(self, image, path, lba, size, is_dir=False):
+        self.image = image
+        self.path = path
+        self.lba = lba
+        self.size = size
+        self.is_dir = is_dir
+
+    def __str__(self):
+        return f"{self.image.path}:{self.path}"
+
+    def __repr__(self):
+        return f"DiscFile({str(self)!r}, lba={self.lba}, size={self.size})"
+
+    @property
+    def name(self):
+        return self.path.rsplit("/", 1)[-1]
+
+    def chunks(self, start=0, end=None):
+        """Yield zero-copy memoryviews of the file's bytes in [start, end), skipping raw sector headers."""
+        end = self.size if end is None else min(end, self.size)
+        image = self.image
+        if image.sector_size == SECTOR_SIZE:
+            # An ISO stores the extent contiguously, so the whole range is one slice of the mapping
+            if start < end:
+                base = self.lba * SECTOR_SIZE
+                yield image.view[base + start:base + end]
+            return
+        while start < end:
+            sector, offset = divmod(start, SECTOR_SIZE)
+            length = min(SECTOR_SIZE - offset, end - start)
+            raw = (self.lba + sector) * image.sector_size + image.data_offset + offset
+            yield image.view[raw:raw + length]
+            start += length
+
+    def read_at(self, offset, size):
+        return b"".join(self.chunks(offset, offset + size))
+
+    def open(self):
+        return DiscFileReader(self)
+
+
+class DiscFileReader(io.RawIOBase):
+    """Seekable binary reader over a DiscFile, so code written for open(path, 'rb') works unchanged."""
+
+    def __init__(self, disc_file):
+        super().__init__()
+        self.disc_file = disc_file
+        self.position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += self.disc_file.size
+        if offset < 0:
+            raise ValueError(f"negative seek position {offset}")
+        self.position = offset
+        return self.position
+
+    def read(self, size=-1):
+        end = self.disc_file.size if size is None or size < 0 else self.position + size
+        data = self.disc_file.read_at(self.position, max(0, end - self.position))
+        self.position += len(data)
+        return data
+
+    def readall(self):
+        return self.read()
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+class DiscImage:
+    """Lazily parsed ISO9660 filesystem of a memory-mapped ISO or raw Mode 1/Mode 2 BIN image."""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        try:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.file.close()
+            raise ValueError(f"{path} is empty")
+        self.view = memoryview(self.data)
+        self.sector_size, self.data_offset = sector_layout(self.data)
+        self.sector_count = len(self.data) // self.sector_size
+        self.directories = {}  # Maps directory LBA to {upper-case name: DiscFile}, parsed on first lookup
+
+        if self.sector_count <= PVD_SECTOR or self.sector(PVD_SECTOR)[:6] != b"\x01CD001":
+            self.close()
+            raise ValueError(f"{path} has no ISO9660 primary volume descriptor")
+        self.root = self.parse_record(self.sector(PVD_SECTOR)[156:190], "")
+        self.root.path = "/"
+
+    def close(self):
+        self.view.release()
+        self.data.close()
+        self.file.close()
+
+    def sector(self, lba):
+        """Return a zero-copy memoryview of one sector's 2048 user data bytes."""
+        start = lba * self.sector_size + self.data_offset
+        return self.view[start:start + SECTOR_SIZE]
+
+    def parse_record(self, record, parent_path):
+        name_length = record[32]
+        name = bytes(record[33:33 + name_length]).decode("ascii", "replace").split(";")[0].rstrip(".")
+        return DiscFile(
+            self,
+            f"{parent_path}/{name}",
+            int.from_bytes(record[2:6], 'little'),
+            int.from_bytes(record[10:14], 'little'),
+            bool(record[25] & 0x02),
+        )
+
+    def listdir(self, directory=None):
+        """Return {upper-case name: DiscFile} for a directory (the root by default)."""
+        directory = directory or self.root
+        entries = self.directories.get(directory.lba)
+        if entries is not None:
+            return entries
+        entries = {}
+        parent_path = "" if directory is self.root else directory.path
+        for sector_index in range((directory.size + SECTOR_SIZE - 1) // SECTOR_SIZE):
+            sector = self.sector(directory.lba + sector_index)
+            offset = 0
+            # Records never straddle sectors; a zero length byte pads out the rest of a sector
+            while offset < SECTOR_SIZE and sector[offset]:
+                record = sector[offset:offset + sector[offset]]
+                offset += len(record)
+                if record[32] == 1 and record[33] in (0, 1):
+                    continue  # "." and ".." entries
+                entry = self.parse_record(record, parent_path)
+                entries[entry.name.upper()] = entry
+        self.directories[directory.lba] = entries
+        return entries
+
+    def find(self, path):
+        """Return the DiscFile at a /-separated path, matched case-insensitively."""
+        entry = self.root
+        for part in filter(None, path.split("/")):
+            entries = self.listdir(entry) if entry.is_dir else {}
+            entry = entries.get(part.upper().split(";")[0])
+            if entry is None:
+                raise FileNotFoundError(f"{path} not found in {self.path}")
+        return entry
+
+    def walk(self, directory=None):
+        """Yield every file below a directory (the root by default), depth first."""
+        for entry in self.listdir(directory).values():
+            if entry.is_dir:
+                yield from self.walk(entry)
+            else:
+                yield entry
+
+    def find_name(self, name):
+        """Return the first file called name anywhere on the disc, or None."""
+        name = name.upper()
+        return next((entry for entry in self.walk() if entry.name.upper() == name), None)
@@ -0,0 +1,101 @@
+"""Table-driven EDC/ECC (ECMA-130) regeneration for raw 2352-byte CD-ROM sectors."""
+from .disc import SYNC_PATTERN
+
+
+def build_tables():
+    """Return the EDC CRC table and the GF(2^8) forward/backward tables used by the ECC."""
+    edc_table = []
+    for i in range(256):
+        edc = i
+        for _ in range(8):
+            edc = (edc >> 1) ^ (0xD8018001 if edc & 1 else 0)
+        edc_table.append(edc)
+    ecc_f_table = [0] * 256
+    ecc_b_table = [0] * 256
+    for i in range(256):
+        j = (i << 1) ^ (0x11D if i & 0x80 else 0)
+        ecc_f_table[i] = j
+        ecc_b_table[i ^ j] = i
+    return edc_table, ecc_f_table, ecc_b_table
+
+
+EDC_TABLE, ECC_F_TABLE, ECC_B_TABLE = build_tables()
+
+
+def parity_indices(major_count, minor_count, major_mult, minor_inc):
+    """Return, for each parity byte pair, the sector offsets of the bytes it covers."""
+    size = major_count * minor_count
+    rows = []
+    for major in range(major_count):
+        index = (major >> 1) * major_mult + (major & 1)
+        row = []
+        for _ in range(minor_count):
+            row.append(12 + index)  # The ECC block starts at the header
+            index += minor_inc
+            if index >= size:
+                index -= size
+        rows.append(row)
+    return rows
+
+
+# P parity covers the header, data and EDC; Q parity covers those and the P parity
+P_INDICES = parity_indices(86, 24, 2, 86)
+Q_INDICES = parity_indices(52, 43, 86, 88)
+P_OFFSET = 2076
+Q_OFFSET = 2248
+
+
+def compute_edc(data):
+    edc = 0
+    table = EDC_TABLE
+    for byte in data:
+        edc = (edc >> 8) ^ table[(edc ^ byte) & 0xFF]
+    return edc
+
+
+def write_parity(sector, indices, parity_offset):
+    major_count = len(indices)
+    f_table, b_table = ECC_F_TABLE, ECC_B_TABLE
+    for major, row in enumerate(indices):
+        ecc_a = ecc_b = 0
+        for index in row:
+            value = sector[index]
+            ecc_a = f_table[ecc_a ^ value]
+            ecc_b ^= value
+        ecc_a = b_table[f_table[ecc_a] ^ ecc_b]
+        sector[parity_offset + major] = ecc_a
+        sector[parity_offset + major + major_count] = ecc_a ^ ecc_b
+
+
+def write_ecc(sector):
+    write_parity(sector, P_INDICES, P_OFFSET)
+    write_parity(sector, Q_INDICES, Q_OFFSET)
+
+
+def trailer_offset(sector):
+    """Return where a raw sector's EDC/ECC trailer starts, which depends on its mode and form."""
+    if sector[15] == 1:
+        return 2064
+    if sector[18] & 0x20:
+        return 2348  # Mode 2 Form 2 has an EDC but no ECC
+    return 2072
+
+
+def regenerate_sector(sector):
+    """Return a copy of a raw sector with the EDC and ECC recomputed from its current data."""
+    sector = bytearray(sector)
+    if sector[:12] != SYNC_PATTERN or sector[15] not in (1, 2):
+        return sector  # Audio or unreadable sectors carry no EDC/ECC
+    if sector[15] == 1:
+        sector[2064:2068] = compute_edc(sector[0:2064]).to_bytes(4, 'little')
+        sector[2068:2076] = bytes(8)
+        write_ecc(sector)
+    elif sector[18] & 0x20:
+        sector[2348:2352] = compute_edc(sector[16:2348]).to_bytes(4, 'little')
+    else:
+        sector[2072:2076] = compute_edc(sector[16:2072]).to_bytes(4, 'little')
+        header = sector[12:16]
+        sector[12:16] = bytes(4)  # Mode 2 computes the ECC with a zeroed header
+        write_ecc(sector)
+        sector[12:16] = header
+    return sector
@@ -0,0 +1,221 @@
+"""Fusion table decoding and fusion-chain solving."""
+import random
+
+from .disc import open_source
+
+
+class FusionTable:
+    """Fusion list decoded from a WA_MRG fusion table, indexed by material pair and by result card."""
+
+    def __init__(self, fusions):
+        self.by_pair = {}  # (lower card_id, higher card_id) -> result card_id
+        self.by_result = {}  # result card_id -> [(lower card_id, higher card_id)]
+        self.partners = {}  # card_id -> {partner card_id: result card_id}
+        for card_a, card_b, result in fusions:
+            pair = (card_a, card_b) if card_a <= card_b else (card_b, card_a)
+            if pair in self.by_pair:
+                continue  # The first listing wins, as it does in game
+            self.by_pair[pair] = result
+            self.by_result.setdefault(result, []).append(pair)
+            self.partners.setdefault(card_a, {})[card_b] = result
+            self.partners.setdefault(card_b, {})[card_a] = result
+
+    @staticmethod
+    def decode(table, total_cards):
+        """Decode a fusion table into (card_a, card_b, result) tuples.
+
+        Each card has a 16-bit pointer at 2 + (card_id - 1) * 2. The pointed-to list starts with a count
+        (0 means 511 minus the next byte), followed by 5-byte groups that pack two fusions: one byte of
+        high bits, then the low bytes of partner 1, result 1, partner 2 and result 2.
+        """
+        fusions = []
+        for card_id in range(1, total_cards + 1):
+            pointer_offset = card_id * 2
+            if pointer_offset + 2 > len(table):
+                break
+            position = int.from_bytes(table[pointer_offset:pointer_offset + 2], 'little')
+            if position == 0 or position >= len(table):
+                continue
+            count = table[position]
+            position += 1
+            if count == 0 and position < len(table):
+                count = 511 - table[position]
+                position += 1
+            while count > 0 and position + 5 <= len(table):
+                high, partner_1, result_1, partner_2, result_2 = table[position:position + 5]
+                position += 5
+                fusions.append((card_id, (high & 3) << 8 | partner_1, (high >> 2 & 3) << 8 | result_1))
+                count -= 1
+                if count > 0:
+                    fusions.append((card_id, (high >> 4 & 3) << 8 | partner_2, (high >> 6 & 3) << 8 | result_2))
+                    count -= 1
+        return fusions
+
+    @classmethod
+    def from_file(cls, path, offset, total_cards, size=0x10000):
+        with open_source(path) as f:
+            f.seek(offset)
+            table = f.read(size)
+        return cls(cls.decode(table, total_cards))
+
+    def __len__(self):
+        return len(self.by_pair)
+
+    def fuse(self, card_a, card_b):
+        """Return the result of fusing two cards, or None."""
+        return self.by_pair.get((card_a, card_b) if card_a <= card_b else (card_b, card_a))
+
+    def fusions_for(self, card_id):
+        """Return {partner card_id: result card_id} for every fusion a card takes part in."""
+        return self.partners.get(card_id, {})
+
+    def recipes(self, result):
+        """Return every (card_a, card_b) material pair that fuses into result."""
+        return self.by_result.get(result, [])
+
+    def deck_fusions(self, card_ids):
+        """Return sorted (card_a, card_b, result) for every fusion available between two cards of a deck."""
+        counts = {}
+        for card_id in card_ids:
+            counts[card_id] = counts.get(card_id, 0) + 1
+        fusions = []
+        for card_a in counts:
+            for card_b, result in self.partners.get(card_a, {}).items():
+                # Each unordered pair once; fusing a card with itself needs two copies
+                if card_b in counts and (card_a < card_b or (card_a == card_b and counts[card_a] > 1)):
+                    fusions.append((card_a, card_b, result))
+        return sorted(fusions)
+
+
+class FusionSolver:
+    """Memoised search for the fusion chains reachable from a hand of up to five cards.
+
+    A chain is the order cards are fused in: (a, b, c) fuses a with b, then that result with c.
+    States are (current card, remaining hand as a sorted tuple), so equal partial multisets are
+    solved once and the memo is shared across hands.
+    """
+
+    def __init__(self, fusion_table, card_stats, total_cards, memo_limit=500000):
+        self.fusion_table = fusion_table
+        self.total_cards = total_cards
+        self.memo_limit = memo_limit
+        self.atk = [0] * (total_cards + 1)
+        for card_id in card_stats:
+            if 0 < card_id <= total_cards:
+                self.atk[card_id] = card_stats[card_id]["atk"]
+        # The last fusion of a chain always uses a hand card, so the best ATK any of its fusions
+        # can produce bounds every chain that still has that card left to play
+        self.max_result_atk = [0] * (total_cards + 1)
+        for card_id in range(1, total_cards + 1):
+            results = fusion_table.fusions_for(card_id).values()
+            self.max_result_atk[card_id] = max((self.atk[result] for result in results if 0 < result <= total_cards), default=0)
+        self.reachable_memo = {}
+        self.best_memo = {}
+
+    def fuse(self, card_a, card_b):
+        """Return the result of fusing two cards, or None; results outside the card list (modded or corrupt tables) are ignored."""
+        result = self.fusion_table.fuse(card_a, card_b)
+        return result if result is not None and 0 < result <= self.total_cards else None
+
+    def check_memo_size(self):
+        if len(self.reachable_memo) + len(self.best_memo) > self.memo_limit:
+            self.reachable_memo.clear()
+            self.best_memo.clear()
+
+    def reachable_from(self, current, remaining):
+        """Return {result: chain suffix} for every result reachable from current with at least one fusion."""
+        key = (current, remaining)
+        results = self.reachable_memo.get(key)
+        if results is not None:
+            return results
+        results = {}
+        previous = None
+        for i, card in enumerate(remaining):
+            if card == previous:
+                continue  # Equal cards lead to equal states
+            previous = card
+            result = self.fuse(current, card)
+            if result is None:
+                continue
+            rest = remaining[:i] + remaining[i + 1:]
+            for final, suffix in [(result, ())] + list(self.reachable_from(result, rest).items()):
+                chain = (card,) + suffix
+                if final not in results or len(chain) < len(results[final]):
+                    results[final] = chain  # Keep the shortest chain to each result
+        self.reachable_memo[key] = results
+        return results
+
+    def best_from(self, current, remaining):
+        """Return (atk, result, chain suffix) of the strongest result reachable from current, or None."""
+        key = (current, remaining)
+        if key in self.best_memo:
+            return self.best_memo[key]
+        best = None
+        previous = None
+        for i, card in enumerate(remaining):
+            if card == previous:
+                continue
+            previous = card
+            result = self.fuse(current, card)
+            if result is None:
+                continue
+            rest = remaining[:i] + remaining[i + 1:]
+            # Prune branches whose ATK bound cannot beat the best found so far; values stored stay exact
+            bound = max([self.atk[result]] + [self.max_result_atk[other] for other in rest])
+            if best is not None and bound <= best[0]:
+                continue
+            candidate = (self.atk[result], result, (card,))
+            deeper = self.best_from(result, rest)
+            if deeper is not None and deeper[0] > candidate[0]:
+                candidate = (deeper[0], deeper[1], (card,) + deeper[2])
+            if best is None or candidate[0] > best[0]:
+                best = candidate
+        self.best_memo[key] = best
+        return best
+
+    def solve(self, hand, top=5):
+        """Return up to top (atk, result, chain) tuples for every fusion result reachable from hand, strongest first."""
+        self.check_memo_size()
+        hand = tuple(sorted(hand))
+        results = {}
+        for i, first in enumerate(hand):
+            if i and hand[i - 1] == first:
+                continue
+            for final, suffix in self.reachable_from(first, hand[:i] + hand[i + 1:]).items():
+                chain = (first,) + suffix
+                if final not in results or len(chain) < len(results[final]):
+                    results[final] = chain
+        ranked = sorted(((self.atk[result], result, chain) for result, chain in results.items()), key=lambda entry: (-entry[0], entry[1]))
+        return ranked[:top]
+
+    def best(self, hand):
+        """Return (atk, result, chain) of the strongest fusion reachable from hand, or None."""
+        self.check_memo_size()
+        hand = tuple(sorted(hand))
+        best = None
+        for i, first in enumerate(hand):
+            if i and hand[i - 1] == first:
+                continue
+            found = self.best_from(first, hand[:i] + hand[i + 1:])
+            if found is not None and (best is None or found[0] > best[0]):
+                best = (found[0], found[1], (first,) + found[2])
+        return best
+
+    def evaluate_deck(self, deck_chances, samples=1000, hand_size=5, rng=None):
+        """Sample hands from {card_id: weight} deck chances (as from parse_deck) and tally the best fusion of each.
+
+        Returns (average best ATK, {result card_id: count}); hands with no fusion count as ATK 0.
+        """
+        rng = rng or random.Random()
+        card_ids = list(deck_chances)
+        weights = list(deck_chances.values())
+        if not card_ids:
+            return 0, {}
+        total_atk = 0
+        result_counts = {}
+        for _ in range(samples):
+            found = self.best(rng.choices(card_ids, weights=weights, k=hand_size))
+            if found is not None:
+                total_atk += found[0]
+                result_counts[found[1]] = result_counts.get(found[1], 0) + 1
+        return total_atk / samples, result_counts
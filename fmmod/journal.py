@@ -0,0 +1,99 @@
+"""On-disk patch journals kept next to patched images so patches can be reversed in a later session."""
+import os
+import json
+import hashlib
+
+JOURNAL_SUFFIX = ".fmjournal"
+JOURNAL_VERSION = 1
+
+
+def journal_path(image_path):
+    return image_path + JOURNAL_SUFFIX
+
+
+def patch_offset(patch):
+    return patch.get('offset', patch.get('address'))
+
+
+def result_digest(patches, image_data):
+    """Hash the bytes image_data holds at every journaled range.
+
+    Only the journaled ranges are read, so checking that an image still carries its patches
+    costs O(journal size) rather than a pass over the whole image.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for patch in patches:
+        offset = patch_offset(patch)
+        digest.update(offset.to_bytes(8, 'little'))
+        digest.update(image_data[offset:offset + len(patch['modified'])])
+    return digest.hexdigest()
+
+
+def write_patch_journal(image_path, patches, image_data):
+    """Write the journal of image_path, whose contents are image_data, or remove it when no patches are left."""
+    path = journal_path(image_path)
+    if not patches:
+        if os.path.exists(path):
+            os.remove(path)
+        return None
+    journal = {
+        "version": JOURNAL_VERSION,
+        "image": os.path.basename(image_path),
+        "size": len(image_data),
+        # From the image rather than the entries: a later patch can overwrite an earlier one's range
+        "result_digest": result_digest(patches, image_data),
+        "patches": [
+            {
+                "type": patch['type'],
+                "offset": patch_offset(patch),
+                "original": bytes(patch['original']).hex(),
+                "modified": bytes(patch['modified']).hex(),
+                "patch_name": patch['patch_name'],
+            }
+            for patch in patches
+        ],
+    }
+    # Write then rename, so a crash never leaves a half-written journal next to the image
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(journal, f, separators=(",", ":"))
+    os.replace(path + ".tmp", path)
+    return path
+
+
+def read_patch_journal(image_path, image_data=None):
+    """Return the journaled patches of image_path, or None if it has no journal that matches the image.
+
+    With image_data the journaled ranges are also checked against the image, so a journal whose
+    patches were since overwritten is ignored.
+    """
+    path = journal_path(image_path)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            journal = json.load(f)
+        if journal.get("version") != JOURNAL_VERSION:
+            raise ValueError(f"unsupported version {journal.get('version')}")
+        patches = []
+        for entry in journal["patches"]:
+            patch = {
+                'type': entry["type"],
+                'original': bytes.fromhex(entry["original"]),
+                'modified': bytes.fromhex(entry["modified"]),
+                'patch_name': entry["patch_name"],
+            }
+            patch['address' if entry["type"] == 'address' else 'offset'] = entry["offset"]
+            patches.append(patch)
+        size = journal["size"]
+        digest = journal["result_digest"]
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+        # AttributeError covers a journal whose top level is not a JSON object
+        print(f"Ignoring unreadable patch journal {path}: {e}")
+        return None
+    if size != os.path.getsize(image_path):
+        print(f"Ignoring patch journal {path}: it was written for a {size} byte image")
+        return None
+    if image_data is not None and result_digest(patches, image_data) != digest:
+        print(f"Ignoring patch journal {path}: the journaled ranges no longer hold the patched bytes")
+        return None
+    return patches
@@ -0,0 +1,489 @@
+"""Signature scanning and the ISO/BIN patch engine."""
+import os
+import re
+import mmap
+import shutil
+
+from .delta import delta_records_from_journal, check_ips_reach, write_ppf3_patch, write_ips_patch, write_bps_patch
+from .disc import SECTOR_SIZE, RAW_SECTOR_SIZE, sector_layout, raw_offset, raw_segments
+from .ecc import regenerate_sector, trailer_offset
+from .journal import read_patch_journal, write_patch_journal
+from .catalogue import BUILTIN_CATALOGUE, load_catalogue, default_catalogue
+
+
+class PatchScanner:
+    """Compiled multi-pattern matcher that finds every patch signature in a single pass."""
+
+    def __init__(self, patterns):
+        # Longest first so the alternation prefers the longest signature at a given offset
+        self.patterns = sorted(set(patterns), key=lambda pattern: (-len(pattern), pattern))
+        self.max_length = len(self.patterns[0]) if self.patterns else 0
+        self.regex = re.compile(b"|".join(re.escape(pattern) for pattern in self.patterns))
+        # A shorter signature that is a prefix of a longer one matches at the same offset
+        self.prefixes = {
+            pattern: [other for other in self.patterns if other != pattern and pattern.startswith(other)]
+            for pattern in self.patterns
+        }
+
+    def scan(self, data, base_offset=0, end=None, occurrences=None):
+        """Return {pattern: [offsets]} for every occurrence starting before `end` (overlaps included)."""
+        if occurrences is None:
+            occurrences = {pattern: [] for pattern in self.patterns}
+        if not self.patterns:
+            return occurrences
+        end = len(data) if end is None else end
+        search_end = min(len(data), end + self.max_length - 1)
+        position = 0
+        while True:
+            match = self.regex.search(data, position, search_end)
+            if match is None or match.start() >= end:
+                break
+            start = match.start()
+            pattern = match.group()
+            occurrences[pattern].append(base_offset + start)
+            for prefix in self.prefixes[pattern]:
+                occurrences[prefix].append(base_offset + start)
+            position = start + 1
+        return occurrences
+
+    def scan_sectors(self, data, sector_size, data_offset, sectors_per_chunk=512):
+        """Scan only the user data of a raw image's sectors and return {pattern: [raw offsets]}.
+
+        Payloads are joined a chunk at a time, with the tail of each chunk carried into the next, so a
+        signature straddling a sector boundary still matches and sync, header and EDC/ECC bytes are never scanned.
+        """
+        found = {pattern: [] for pattern in self.patterns}
+        if not self.patterns:
+            return found
+        overlap = self.max_length - 1
+        sector_count = len(data) // sector_size
+        view = memoryview(data)
+        try:
+            carry = b""
+            base_offset = 0  # User data offset of the buffer's first byte
+            for first in range(0, sector_count, sectors_per_chunk):
+                last = min(first + sectors_per_chunk, sector_count)
+                buffer = carry + b"".join(
+                    view[start:start + SECTOR_SIZE]
+                    for start in range(first * sector_size + data_offset, last * sector_size, sector_size)
+                )
+                limit = len(buffer) if last == sector_count else max(len(buffer) - overlap, 0)
+                self.scan(buffer, base_offset, end=limit, occurrences=found)
+                carry = buffer[limit:]
+                base_offset += limit
+        finally:
+            view.release()
+        return {
+            pattern: [raw_offset(offset, sector_size, data_offset) for offset in offsets]
+            for pattern, offsets in found.items()
+        }
+
+
+# Built-in patch groups in the order they are checked and applied, as (key, display name);
+# default_catalogue() also has the groups of any user catalogues
+PATCH_GROUPS = load_catalogue([BUILTIN_CATALOGUE]).group_names()
+
+# "copy" writes a full _Patched file; "clone" and "in_place" patch a memory-mapped image;
+# "ppf", "ips" and "bps" patch a private copy-on-write mapping and only write a delta patch
+OUTPUT_MODES = ("copy", "clone", "in_place", "ppf", "ips", "bps")
+DELTA_MODES = ("ppf", "ips", "bps")
+
+
+class PatchEngine:
+    """Finds, applies and reverses the mod patches on an ISO/BIN image, journaling every changed range.
+
+    The patches come from the patch catalogue. Front ends pick them through enabled_patches,
+    patch_parameters (drop_rate is a shortcut for its "drop_rate" entry) and force, and can override
+    report() and report_error() to surface progress.
+    """
+
+    def __init__(self):
+        self.enabled_patches = set() # Group keys from the patch catalogue to apply
+        self.patch_parameters = {} # Catalogue parameter values, e.g. {"drop_rate": "1000"}; unset ones use their defaults
+        self.force = False # Reapply patches that already look applied
+        self.catalogue = None # PatchCatalogue, loaded on first use
+        self.applied_patches = []
+        self.patched_path = None # Output file of the last patch run, used by reverse_journal
+
+    @property
+    def drop_rate(self):
+        return self.patch_parameters.get("drop_rate")
+
+    @drop_rate.setter
+    def drop_rate(self, value):
+        self.patch_parameters["drop_rate"] = value
+
+    def report(self, message):
+        """Progress hook; the headless engine already logs details with print()."""
+
+    def report_error(self, message):
+        """Error hook for problems the engine skips over."""
+
+    def check_overlap(self, patch_index, change):
+        original_bytes = change['original']
+        modified_bytes = change['modified']
+        is_applied = bool(patch_index.get(modified_bytes)) and not patch_index.get(original_bytes)
+        return is_applied, original_bytes
+
+    def check_overlap_address(self, iso_data, change):
+        address = change['address']
+        modified_bytes = change['modified']
+        if address + len(modified_bytes) <= len(iso_data):
+            current_bytes = iso_data[address:address + len(modified_bytes)]
+            is_applied = current_bytes == modified_bytes
+            return is_applied, current_bytes
+        return False, None
+
+    def get_catalogue(self):
+        if self.catalogue is None:
+            self.catalogue = default_catalogue()
+        return self.catalogue
+
+    def get_catalogue_patches(self):
+        """Return {group key: patches} of the enabled groups, with the parameterised bytes for the current patch_parameters."""
+        catalogue = self.get_catalogue()
+        return catalogue.resolve(catalogue.parameter_values(self.patch_parameters), self.enabled_patches)
+
+    def get_patch_scanner(self):
+        """Return the PatchScanner for the enabled groups' signatures, compiled once per set of signatures."""
+        catalogue = self.get_catalogue()
+        patterns = catalogue.signatures(self.get_catalogue_patches())
+        scanner = catalogue.scanners.get(patterns)
+        if scanner is None:
+            scanner = catalogue.scanners[patterns] = PatchScanner(patterns)
+        return scanner
+
+    def scan_image(self, iso_data):
+        """Index every signature in an image; on a raw BIN only the sectors' user data is scanned."""
+        sector_size, data_offset = sector_layout(iso_data)
+        if sector_size == SECTOR_SIZE:
+            return self.get_patch_scanner().scan(iso_data)
+        return self.get_patch_scanner().scan_sectors(iso_data, sector_size, data_offset)
+
+    def parse_group_changes(self, patches, iso_data, patch_index):
+        """Return the changes one catalogue group still needs: one per address patch, one per signature occurrence."""
+        changes = []
+        for patch in patches:
+            if 'address' in patch:
+                change = dict(patch)
+                is_applied, current_bytes = self.check_overlap_address(iso_data, change)
+                if is_applied and not self.force:
+                    print(f"{patch['patch_name']} already applied at {hex(patch['address'])} "
+                          f"(current: {current_bytes.hex().upper()})")
+                else:
+                    if current_bytes:
+                        print(f"{patch['patch_name']} at {hex(patch['address'])}: "
+                              f"Current bytes {current_bytes.hex().upper()}, "
+                              f"Applying {patch['modified'].hex().upper()}")
+                    changes.append(change)
+                continue
+            is_applied, _ = self.check_overlap(patch_index, patch)
+            if is_applied and not self.force:
+                print(f"Patch {patch['patch_name']} already applied: {patch['modified'].hex().upper()}")
+                continue
+            for offset in patch_index.get(patch['original'], []):
+                changes.append(dict(patch, offset=offset))
+        return changes
+
+    def clone_image(self, source_path, target_path):
+        """Clone an image for patching, sharing extents copy-on-write where the filesystem allows it."""
+        with open(source_path, 'rb') as src, open(target_path, 'wb') as dst:
+            try:
+                import fcntl
+                fcntl.ioctl(dst.fileno(), 0x40049409, src.fileno())  # FICLONE
+                return
+            except (ImportError, OSError):
+                pass
+        # No reflink support; copyfile still copies in the kernel where it can
+        shutil.copyfile(source_path, target_path)
+
+    def open_image_mapping(self, path):
+        """Memory-map an image for in-place patching; pages are loaded on demand."""
+        image_file = open(path, 'r+b')
+        try:
+            return image_file, mmap.mmap(image_file.fileno(), 0)
+        except Exception:
+            image_file.close()
+            raise
+
+    def apply_patch_changes(self, iso_data, changes, patch_index):
+        """Write the changes into iso_data (bytearray or mmap), journaling every touched range in applied_patches."""
+        sector_size, data_offset = sector_layout(iso_data)
+        for change in changes:
+            if 'address' in change:
+                address = change['address']
+                modified_bytes = change['modified']
+                if address + len(modified_bytes) <= len(iso_data):
+                    original_bytes = iso_data[address:address + len(modified_bytes)]
+                    iso_data[address:address + len(modified_bytes)] = modified_bytes
+                    self.applied_patches.append({
+                        'type': 'address',
+                        'address': address,
+                        'original': original_bytes,
+                        'modified': modified_bytes,
+                        'patch_name': change['patch_name']
+                    })
+                    print(f"Patched {change['patch_name']} at {hex(address)}: {modified_bytes.hex().upper()}")
+                    self.report(f"Patched {change['patch_name']} at {hex(address)}")
+                else:
+                    print(f"Error: Address {hex(address)} out of range for {change['patch_name']}")
+                    self.report_error(f"Address {hex(address)} out of range.")
+            else:
+                original_bytes = change['original']
+                modified_bytes = change['modified'][:len(change['original'])]
+                count = 0
+                offsets = [change['offset']] if 'offset' in change else patch_index.get(original_bytes, [])
+                for offset in offsets:
+                    # On a raw BIN a match can straddle a sector boundary; each run stays inside one sector's user data
+                    segments = raw_segments(offset, len(original_bytes), sector_size, data_offset)
+                    # Verify the occurrence is still intact; an earlier change may have rewritten it
+                    if b"".join(iso_data[start:start + length] for start, length in segments) != original_bytes:
+                        continue
+                    position = 0
+                    for start, length in segments:
+                        # Journal each run separately so reversal and delta patches never touch the bytes between them
+                        self.applied_patches.append({
+                            'type': 'search',
+                            'offset': start,
+                            'original': iso_data[start:start + length],
+                            'modified': modified_bytes[position:position + length],
+                            'patch_name': change['patch_name']
+                        })
+                        iso_data[start:start + length] = modified_bytes[position:position + length]
+                        position += length
+                    print(f"Patched {change['patch_name']} at {hex(offset)}: {modified_bytes.hex().upper()}")
+                    count += 1
+                if count == 0:
+                    print(f"Warning: No matches found for {original_bytes.hex().upper()} in {change['patch_name']}")
+                    self.report(f"No matches for {change['patch_name']}")
+                else:
+                    self.report(f"Applied {count} {change['patch_name']} patch(es)")
+
+    @staticmethod
+    def patch_sectors(patch):
+        """Return the raw sector numbers a journaled range covers."""
+        start = patch.get('offset', patch.get('address'))
+        return range(start // RAW_SECTOR_SIZE, (start + len(patch['modified']) - 1) // RAW_SECTOR_SIZE + 1)
+
+    def regenerate_sector_trailer(self, iso_data, sector):
+        """Recompute a raw sector's EDC/ECC in iso_data; return (trailer offset, old trailer, new trailer)."""
+        start = sector * RAW_SECTOR_SIZE
+        current = iso_data[start:start + RAW_SECTOR_SIZE]
+        regenerated = regenerate_sector(current)
+        trailer = trailer_offset(current)
+        iso_data[start + trailer:start + RAW_SECTOR_SIZE] = regenerated[trailer:]
+        return start + trailer, current[trailer:], bytes(regenerated[trailer:])
+
+    def regenerate_patched_sectors(self, iso_data):
+        """Bring the EDC/ECC of every raw sector the journal touches up to date, journaling each changed trailer."""
+        if sector_layout(iso_data)[0] != RAW_SECTOR_SIZE:
+            return 0
+        sector_count = len(iso_data) // RAW_SECTOR_SIZE
+        sectors = sorted({
+            sector for patch in self.applied_patches if patch['type'] != 'ecc'
+            for sector in self.patch_sectors(patch) if sector < sector_count
+        })
+        count = 0
+        for sector in sectors:
+            offset, original, modified = self.regenerate_sector_trailer(iso_data, sector)
+            if original != modified:
+                # Journaled like any other range so delta patches carry it and reversal can restore it
+                self.applied_patches.append({
+                    'type': 'ecc',
+                    'offset': offset,
+                    'original': original,
+                    'modified': modified,
+                    'patch_name': 'EDC/ECC'
+                })
+                count += 1
+        print(f"Regenerated EDC/ECC of {count} of {len(sectors)} patched sectors")
+        return count
+
+    def write_delta_patch(self, patch_format, patch_path, source_path):
+        """Serialise applied_patches as a PPF3, IPS or BPS patch against the source image."""
+        records = delta_records_from_journal(self.applied_patches)
+        if patch_format == "ppf":
+            write_ppf3_patch(patch_path, records, source_path)
+        elif patch_format == "ips":
+            write_ips_patch(patch_path, records, source_path)
+        else:
+            write_bps_patch(patch_path, records, source_path)
+        print(f"Wrote {len(records)} {patch_format.upper()} records to {patch_path}")
+
+    def find_changes(self, iso_data, patch_index):
+        """Return (changes, status messages) for every enabled patch group that still needs applying."""
+        changes = []
+        status_messages = []
+        catalogue_patches = self.get_catalogue_patches()
+        for patch_key, patch_name in self.get_catalogue().group_names():
+            if patch_key in self.enabled_patches:
+                patch_changes = self.parse_group_changes(catalogue_patches[patch_key], iso_data, patch_index)
+                if not patch_changes:
+                    status_messages.append(f"{patch_name}: Already applied or skipped")
+                else:
+                    status_messages.append(f"{patch_name}: Ready to apply {len(patch_changes)} changes")
+                    changes.extend(patch_changes)
+        return changes, status_messages
+
+    def patch_image(self, iso_path, output_mode="copy"):
+        """Apply the enabled patches to iso_path and return the output path, or None if nothing needed applying."""
+        image_file = None
+        if output_mode == "copy":
+            with open(iso_path, 'rb') as f:
+                iso_data = bytearray(f.read())
+        elif output_mode == "in_place":
+            image_file, iso_data = self.open_image_mapping(iso_path)
+        elif output_mode in DELTA_MODES:
+            image_file = open(iso_path, 'rb')
+            iso_data = mmap.mmap(image_file.fileno(), 0, access=mmap.ACCESS_COPY)
+        else:
+            image_file = open(iso_path, 'rb')
+            iso_data = mmap.mmap(image_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            self.report("Checking patches...")
+
+            # One pass over the image finds every signature; parse, apply and verify all reuse this index
+            patch_index = self.scan_image(iso_data)
+            changes, status_messages = self.find_changes(iso_data, patch_index)
+            self.report("\n".join(status_messages))
+            if not changes:
+                return None
+            if output_mode == "ips":
+                # Refuse up front; the password patch alone sits past the 16 MiB IPS can address
+                check_ips_reach([(change.get('offset', change.get('address')), None, change['modified']) for change in changes])
+
+            self.applied_patches = []
+            # An image that already carries journaled patches passes their entries on to its output
+            prior_patches = [] if output_mode in DELTA_MODES else read_patch_journal(iso_path, iso_data) or []
+            if output_mode == "in_place":
+                output_file_path = iso_path
+            elif output_mode in DELTA_MODES:
+                output_file_path = os.path.splitext(iso_path)[0] + "_Patched." + output_mode
+            else:
+                output_file_path = os.path.splitext(iso_path)[0] + "_Patched" + os.path.splitext(iso_path)[1]
+
+            if output_mode == "clone":
+                # The source was only mapped read-only for scanning; patch a clone of it instead
+                iso_data.close()
+                image_file.close()
+                self.report("Cloning image...")
+                self.clone_image(iso_path, output_file_path)
+                image_file, iso_data = self.open_image_mapping(output_file_path)
+
+            self.report("Patching file...")
+            self.apply_patch_changes(iso_data, changes, patch_index)
+            self.regenerate_patched_sectors(iso_data)
+
+            if image_file is None:
+                with open(output_file_path, 'wb') as f:
+                    f.write(iso_data)
+            elif output_mode in DELTA_MODES:
+                self.write_delta_patch(output_mode, output_file_path, iso_path)
+            else:
+                iso_data.flush()
+            if output_mode not in DELTA_MODES:
+                write_patch_journal(output_file_path, prior_patches + self.applied_patches, iso_data)
+            # A delta patch leaves no patched image behind to reverse
+            self.patched_path = None if output_mode in DELTA_MODES else output_file_path
+        finally:
+            if image_file is not None:
+                iso_data.close()
+                image_file.close()
+
+        touched = sum(len(patch['modified']) for patch in self.applied_patches)
+        print(f"Journaled {len(self.applied_patches)} ranges ({touched} bytes) in {output_file_path}")
+        return output_file_path
+
+    def load_journal(self, iso_path):
+        """Return (image path, journaled patches) for the patched image of iso_path, from its on-disk journal if any.
+
+        The last patched output, iso_path itself and its _Patched copy are tried in turn; without a
+        journal on disk the patches applied in this session to a written image are returned.
+        """
+        candidates = [self.patched_path, iso_path, os.path.splitext(iso_path)[0] + "_Patched" + os.path.splitext(iso_path)[1]]
+        for image_path in candidates:
+            if not image_path or not os.path.exists(image_path) or os.path.getsize(image_path) == 0:
+                continue
+            with open(image_path, 'rb') as image_file, mmap.mmap(image_file.fileno(), 0, access=mmap.ACCESS_READ) as image_data:
+                patches = read_patch_journal(image_path, image_data)
+            if patches is not None:
+                return image_path, patches
+        # The session's own patches only describe an image when one was written; a delta mode leaves the source untouched
+        if self.patched_path and os.path.exists(self.patched_path):
+            return self.patched_path, self.applied_patches
+        return iso_path, []
+
+    def reverse_journal(self, iso_path, patch_names, output_mode="copy"):
+        """Restore the journaled ranges of the named patches; return (reversed count, output path).
+
+        Mapped modes restore the ranges in place, touching only the journaled bytes, and rewrite the
+        image's on-disk journal to hold whatever is left.
+        """
+        source_path, patches = self.load_journal(iso_path)
+        image_file = None
+        if output_mode == "copy":
+            with open(source_path, 'rb') as f:
+                iso_data = bytearray(f.read())
+        else:
+            # Mapped modes restore the journaled ranges in place
+            image_file, iso_data = self.open_image_mapping(source_path)
+
+        reversed_count = 0
+        remaining = []  # (journal index, patch) of the entries that stay journaled
+        ecc_patches = []
+        reversed_sectors = set()
+        try:
+            # Newest first, so a range patched twice gets back the bytes from before its first patch
+            for index in range(len(patches) - 1, -1, -1):
+                patch = patches[index]
+                if patch['type'] == 'ecc':
+                    ecc_patches.append((index, patch))  # Settled below, once the data they cover is back
+                    continue
+                if patch['patch_name'] not in patch_names:
+                    remaining.append((index, patch))
+                    continue
+                start = patch.get('offset', patch.get('address'))
+                original_bytes = patch['original']
+                if patch['type'] != 'address' and iso_data[start:start + len(patch['modified'])] != patch['modified']:
+                    # Kept, so a later reverse still knows about the range
+                    print(f"Skipped {patch['patch_name']} at {hex(start)}: bytes no longer match the applied patch")
+                    remaining.append((index, patch))
+                elif start + len(original_bytes) <= len(iso_data):
+                    iso_data[start:start + len(original_bytes)] = original_bytes
+                    print(f"Reversed {patch['patch_name']} at {hex(start)}")
+                    reversed_count += 1
+                    reversed_sectors.update(self.patch_sectors(patch))
+                else:
+                    remaining.append((index, patch))
+
+            # A sector with no patches left gets its original EDC/ECC back; one still partly patched is recomputed
+            still_patched = {sector for _, patch in remaining for sector in self.patch_sectors(patch)}
+            for index, patch in ecc_patches:
+                sector = patch['offset'] // RAW_SECTOR_SIZE
+                if sector not in reversed_sectors:
+                    remaining.append((index, patch))
+                elif sector in still_patched:
+                    modified = self.regenerate_sector_trailer(iso_data, sector)[2]
+                    remaining.append((index, dict(patch, modified=modified)))
+                else:
+                    offset = patch['offset']
+                    iso_data[offset:offset + len(patch['original'])] = patch['original']
+            # Back to journal order, so every EDC/ECC entry still follows the data entries it covers
+            remaining_patches = [patch for _, patch in sorted(remaining, key=lambda entry: entry[0])]
+
+            if image_file is None:
+                output_file_path = os.path.splitext(iso_path)[0] + "_Reversed" + os.path.splitext(iso_path)[1]
+                with open(output_file_path, 'wb') as f:
+                    f.write(iso_data)
+            else:
+                output_file_path = source_path
+                iso_data.flush()
+                # The reversed ranges are gone from the image, so drop them from the journal
+                self.applied_patches = remaining_patches
+            write_patch_journal(output_file_path, remaining_patches, iso_data)
+        finally:
+            if image_file is not None:
+                iso_data.close()
+                image_file.close()
+        return reversed_count, output_file_path
@@ -0,0 +1,61 @@
+"""Substring search over card fields."""
+
+
+class SearchIndex:
+    """Inverted index of 1- to 3-grams over each card's searchable fields for fast substring search.
+
+    Basic fields (ID, name, ATK/DEF) and descriptions are indexed separately because the opponent
+    views only search the former. Grams never span two fields, so queries of up to three characters
+    are answered exactly from the index; longer ones intersect their trigram sets and only check
+    the surviving candidates.
+    """
+
+    def __init__(self):
+        self.basic_fields = {}  # card_id -> (id, name, atk/def), lowercased
+        self.descriptions = {}  # card_id -> description, lowercased
+        self.basic_grams = {}
+        self.description_grams = {}
+
+    @staticmethod
+    def add_grams(grams, card_id, text):
+        for size in (1, 2, 3):
+            for start in range(len(text) - size + 1):
+                grams.setdefault(text[start:start + size], set()).add(card_id)
+
+    def add(self, card_id, basic_fields, description):
+        self.basic_fields[card_id] = basic_fields
+        self.descriptions[card_id] = description
+        for text in basic_fields:
+            self.add_grams(self.basic_grams, card_id, text)
+        self.add_grams(self.description_grams, card_id, description)
+
+    @staticmethod
+    def search_grams(grams, query, texts_of):
+        if len(query) <= 3:
+            return set(grams.get(query, ()))
+        trigram_sets = sorted((grams.get(query[start:start + 3], set()) for start in range(len(query) - 2)), key=len)
+        candidates = set(trigram_sets[0])
+        for trigram_set in trigram_sets[1:]:
+            if not candidates:
+                break
+            candidates &= trigram_set
+        return {card_id for card_id in candidates if any(query in text for text in texts_of(card_id))}
+
+    def search(self, query, include_description=True):
+        """Return the set of card IDs with a field containing query (case-insensitive)."""
+        query = query.lower()
+        if not query:
+            return set(self.basic_fields)
+        matches = self.search_grams(self.basic_grams, query, self.basic_fields.__getitem__)
+        if include_description:
+            matches |= self.search_grams(self.description_grams, query, lambda card_id: (self.descriptions[card_id],))
+        return matches
+
+    def refine(self, candidates, query, include_description=True):
+        """Return the subset of candidates matching query, for queries that extend an earlier one."""
+        query = query.lower()
+        return {
+            card_id for card_id in candidates
+            if any(query in text for text in self.basic_fields[card_id])
+            or (include_description and query in self.descriptions[card_id])
+        }
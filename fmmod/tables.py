@@ -0,0 +1,152 @@
+"""Packed card stat, drop and dropper tables decoded from SLUS_014.11 and WA_MRG.MRG."""
+import sys
+import struct
+from array import array
+from collections.abc import Mapping
+
+from .disc import open_source
+
+
+class CardStatTable(Mapping):
+    """Struct-of-arrays card stats decoded from SLUS_014.11, with per-card dict views built on demand."""
+
+    def __init__(self, slus_data, total_cards, stats_offset, levels_offset, card_types_map, guardian_stars_map, card_attributes_map):
+        count = max(0, min(total_cards, (len(slus_data) - stats_offset) // 4, len(slus_data) - levels_offset))
+        # One little-endian word per card: ATK (bits 0-8), DEF (9-17), Guardian Star 2 (18-21),
+        # Guardian Star 1 (22-25) and Type (26-30); levels hold Level (low nibble) and Attribute (high nibble)
+        words = struct.unpack_from(f"<{count}I", slus_data, stats_offset)
+        levels = slus_data[levels_offset:levels_offset + count]
+        self.count = count
+        self.atk = array('H', [(word & 0x1FF) * 10 for word in words])
+        self.defense = array('H', [((word >> 9) & 0x1FF) * 10 for word in words])
+        self.guard_star_2_id = array('B', [(word >> 18) & 0xF for word in words])
+        self.guard_star_1_id = array('B', [(word >> 22) & 0xF for word in words])
+        self.type_id = array('B', [(word >> 26) & 0x1F for word in words])
+        self.level = array('B', [level & 0x0F for level in levels])
+        self.attribute_id = array('B', [level >> 4 for level in levels])
+        self.card_types_map = dict(card_types_map)
+        self.guardian_stars_map = dict(guardian_stars_map)
+        self.card_attributes_map = dict(card_attributes_map)
+        self.views = {}
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return iter(range(1, self.count + 1))
+
+    def __getitem__(self, card_id):
+        if not isinstance(card_id, int) or not 1 <= card_id <= self.count:
+            raise KeyError(card_id)
+        view = self.views.get(card_id)
+        if view is None:
+            i = card_id - 1
+            view = self.views[card_id] = {
+                "atk": self.atk[i],
+                "def": self.defense[i],
+                "type": self.card_types_map.get(self.type_id[i], f"Unknown Type ({self.type_id[i]})"),
+                "guard_star_1": self.guardian_stars_map.get(self.guard_star_1_id[i], f"Unknown GS ({self.guard_star_1_id[i]})"),
+                "guard_star_2": self.guardian_stars_map.get(self.guard_star_2_id[i], f"Unknown GS ({self.guard_star_2_id[i]})"),
+                "attribute": self.card_attributes_map.get(self.attribute_id[i], f"Unknown Attribute ({hex(self.attribute_id[i])})"),
+                "level": self.level[i],
+            }
+        return view
+
+
+class DropMatrix:
+    """Dense opponent x pool x card matrix of deck and drop weights, read from WA_MRG in one call."""
+
+    pools = ("deck", "sa_pow", "bcd", "sa_tec")
+
+    def __init__(self, region, total_cards, block_size, pool_offsets):
+        self.total_cards = total_cards
+        self.opponent_count = len(region) // block_size
+        raw = array('H', region[:self.opponent_count * block_size])
+        if sys.byteorder == 'big':
+            raw.byteswap()
+        # Pack the (opponents, 4 pools, cards) weights contiguously so each opponent's pool is a plain slice
+        self.weights = array('H')
+        for opponent_id in range(self.opponent_count):
+            for pool_offset in pool_offsets:
+                start = (opponent_id * block_size + pool_offset) // 2
+                self.weights.extend(raw[start:start + total_cards])
+
+    @classmethod
+    def from_file(cls, path, base_offset, opponent_count, total_cards, block_size, pool_offsets):
+        with open_source(path) as f:
+            f.seek(base_offset)
+            region = f.read(opponent_count * block_size)
+        return cls(region, total_cards, block_size, pool_offsets)
+
+    def row(self, opponent_id, pool):
+        """Weights of every card in one opponent's pool (index card_id - 1), as a zero-copy view."""
+        start = (opponent_id * len(self.pools) + self.pools.index(pool)) * self.total_cards
+        return memoryview(self.weights)[start:start + self.total_cards]
+
+    def chances(self, opponent_id, pool, cap=None):
+        """Return {card_id: weight} for the non-zero entries of one opponent's pool, optionally capped."""
+        chances = {}
+        for card_id, weight in enumerate(self.row(opponent_id, pool), start=1):
+            if not weight:
+                continue
+            if cap is not None and weight > cap:
+                print(f"Warning: Invalid chance {weight} for card {card_id} in {pool}, capped to {cap}")
+                weight = cap
+            chances[card_id] = weight
+        return chances
+
+
+class DropperIndex:
+    """CSR inverted index from card to (opponent, pool, weight), each card's droppers presorted by weight."""
+
+    pools = ("sa_pow", "bcd", "sa_tec")
+
+    def __init__(self, drop_matrix, opponent_count, cap=2048):
+        total_cards = drop_matrix.total_cards
+        opponent_count = min(opponent_count, drop_matrix.opponent_count)
+        buckets = [[] for _ in range(total_cards)]
+        # Opponent 0 has no drop data; walk each (opponent, pool) row once and bucket the non-zero weights by card
+        for opponent_id in range(1, opponent_count):
+            for pool_id, pool in enumerate(self.pools):
+                row = drop_matrix.row(opponent_id, pool)
+                for card_index in [index for index, weight in enumerate(row) if weight]:
+                    buckets[card_index].append((min(row[card_index], cap), pool_id, opponent_id))
+
+        self.total_cards = total_cards
+        self.indptr = array('I', [0])
+        self.opponent_ids = array('B')
+        self.pool_ids = array('B')
+        self.weights = array('H')
+        # Best opponent and weight per pool, indexed by card_id (opponent 0 means nobody drops it)
+        self.best_opponent = [array('B', bytes(total_cards + 1)) for _ in self.pools]
+        self.best_weight = [array('H', bytes(2 * (total_cards + 1))) for _ in self.pools]
+        for card_id, bucket in enumerate(buckets, start=1):
+            bucket.sort(key=lambda entry: (-entry[0], entry[1], entry[2]))
+            for weight, pool_id, opponent_id in bucket:
+                if not self.best_weight[pool_id][card_id]:
+                    self.best_opponent[pool_id][card_id] = opponent_id
+                    self.best_weight[pool_id][card_id] = weight
+                self.opponent_ids.append(opponent_id)
+                self.pool_ids.append(pool_id)
+                self.weights.append(weight)
+            self.indptr.append(len(self.weights))
+
+    def droppers(self, card_id, pool=None):
+        """Return [(opponent_id, pool, weight)] for a card, highest weight first, optionally for one pool."""
+        if not 1 <= card_id <= self.total_cards:
+            return []
+        pool_id = None if pool is None else self.pools.index(pool)
+        return [
+            (self.opponent_ids[i], self.pools[self.pool_ids[i]], self.weights[i])
+            for i in range(self.indptr[card_id - 1], self.indptr[card_id])
+            if pool_id is None or self.pool_ids[i] == pool_id
+        ]
+
+    def best(self, card_id, pool):
+        """Return (opponent_id, weight) of the best opponent to farm a card in a pool, or None."""
+        if not 1 <= card_id <= self.total_cards:
+            return None
+        pool_id = self.pools.index(pool)
+        if not self.best_weight[pool_id][card_id]:
+            return None
+        return self.best_opponent[pool_id][card_id], self.best_weight[pool_id][card_id]
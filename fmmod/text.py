@@ -0,0 +1,103 @@
+"""Forbidden Memories text encoding."""
+import re
+import struct
+
+# Game byte to character table shared by every text table in SLUS_014.11
+CHAR_MAP = {
+    0x18: "A", 0x2D: "B", 0x2B: "C", 0x20: "D", 0x25: "E", 0x31: "F", 0x29: "G",
+    0x23: "H", 0x1A: "I", 0x3B: "J", 0x33: "K", 0x2A: "L", 0x1E: "M", 0x2C: "N",
+    0x21: "O", 0x2F: "P", 0x3E: "Q", 0x26: "R", 0x1D: "S", 0x1C: "T", 0x35: "U",
+    0x39: "V", 0x22: "W", 0x46: "X", 0x24: "Y", 0x3F: "Z",
+    0x03: "a", 0x15: "b", 0x0F: "c", 0x0C: "d", 0x01: "e", 0x13: "f", 0x10: "g",
+    0x09: "h", 0x05: "i", 0x34: "j", 0x16: "k", 0x0A: "l", 0x0E: "m", 0x06: "n",
+    0x04: "o", 0x14: "p", 0x37: "q", 0x08: "r", 0x07: "s", 0x02: "t", 0x0D: "u",
+    0x19: "v", 0x12: "w", 0x36: "x", 0x11: "y", 0x32: "z",
+    0x38: "0", 0x3D: "1", 0x3A: "2", 0x41: "3", 0x4A: "4", 0x42: "5", 0x4E: "6",
+    0x45: "7", 0x57: "8", 0x59: "9",
+    0x00: " ", 0x30: "-", 0x3C: "#", 0x43: "&", 0x0B: ".", 0x1F: ",", 0x55: "a",
+    0x17: "!", 0x1B: "'", 0x27: "<", 0x28: ">", 0x2E: "?", 0x44: "/", 0x48: ":",
+    0x4B: ")", 0x4C: "(", 0x4F: "$", 0x50: "*", 0x51: ">", 0x54: "<", 0x40: "\"",
+    0x56: "+", 0x5B: "%",
+    0xFF: "",  # Terminator
+    0x5C: "@", 0x5D: "^", 0x5E: "~", 0x5F: "_", 0x60: "`", 0x61: "{", 0x62: "}",
+    0x63: "[", 0x64: "]", 0x65: "=", 0x66: ";", 0x67: "\\",
+    0x47: " ", 0x6F: "?", 0x77: "?", 0x7F: "?", 0x8F: "?", 0x97: "?", 0x9F: "?",
+    0xAF: "?", 0xB7: "?", 0xC7: "?", 0xE7: "?", 0xEF: "?", 0xF7: "?",
+}
+
+
+class TextCodec:
+    """Precompiled decoder for the game's text encoding shared by all SLUS string loaders.
+
+    Plain characters go through a 256-entry translation table in one call per run;
+    control codes are handled by a small state machine driven by the dialect.
+    """
+
+    # Dialects describe how each string table uses the control codes
+    # leading_prefixes is how many "F8 xx xx" prefixes may be skipped before the text, None for any number
+    NAMES = {'stops': b"\xff", 'controls': {}, 'leading_prefixes': 1}
+    OPPONENTS = {'stops': b"\xff\xfd", 'controls': {}, 'leading_prefixes': None}
+    LABELS = {'stops': b"\xff", 'controls': {0xF8: 3}, 'leading_prefixes': 0}
+    DESCRIPTIONS = {'stops': b"\xff", 'controls': {0xF8: 2, 0xD5: 2, 0xFC: 2}, 'soft_space': 0xFE, 'leading_prefixes': 0}
+
+    def __init__(self, char_map):
+        self.table = {byte: char_map.get(byte, f"?[{hex(byte)}]") for byte in range(256)}
+        self.special_patterns = {}
+
+    def special_pattern(self, dialect):
+        """Compile (once per dialect) a regex matching every byte that leaves the plain-character path."""
+        key = id(dialect)
+        if key not in self.special_patterns:
+            special = set(dialect['stops']) | set(dialect['controls'])
+            if 'soft_space' in dialect:
+                special.add(dialect['soft_space'])
+            self.special_patterns[key] = re.compile(b"[" + b"".join(re.escape(bytes([byte])) for byte in sorted(special)) + b"]")
+        return self.special_patterns[key]
+
+    def translate(self, raw):
+        return raw.decode('latin-1').translate(self.table)
+
+    def decode(self, data, text_offset, max_length, dialect):
+        """Decode one string starting at text_offset, reading at most max_length bytes."""
+        end = min(text_offset + max_length, len(data))
+        position = text_offset
+        # Skip "F8 xx xx" formatting prefixes in front of the text
+        prefixes = dialect['leading_prefixes']
+        while prefixes != 0 and position + 3 <= end and data[position] == 0xF8:
+            position += 3
+            if prefixes is not None:
+                prefixes -= 1
+        pattern = self.special_pattern(dialect)
+        controls = dialect['controls']
+        soft_space = dialect.get('soft_space')
+        parts = []
+        while position < end:
+            match = pattern.search(data, position, end)
+            if match is None:
+                parts.append(self.translate(data[position:end]))
+                break
+            special_offset = match.start()
+            if special_offset > position:
+                parts.append(self.translate(data[position:special_offset]))
+            byte = data[special_offset]
+            if byte in dialect['stops']:
+                break
+            if byte == soft_space:
+                # Line breaks become a space only between two non-blank bytes
+                previous_byte = data[special_offset - 1] if special_offset > text_offset else 0x00
+                next_byte = data[special_offset + 1] if special_offset + 1 < len(data) else 0x00
+                if previous_byte != 0x00 and next_byte != 0x00:
+                    parts.append(" ")
+                position = special_offset + 1
+            elif special_offset + controls[byte] - 1 < end:
+                position = special_offset + controls[byte]  # Control code and its parameter bytes
+            else:
+                parts.append(self.table[byte])
+                position = special_offset + 1
+        return "".join(parts)
+
+    def decode_table(self, data, pointer_offset, text_base, count, max_length, dialect):
+        """Decode a whole pointer table of 16-bit little-endian offsets relative to text_base in bulk."""
+        count = max(0, min(count, (len(data) - pointer_offset) // 2))
+        pointers = struct.unpack_from(f"<{count}H", data, pointer_offset)
+        return [self.decode(data, text_base + pointer, max_length, dialect) for pointer in pointers]
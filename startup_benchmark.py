@@ -0,0 +1,73 @@
+"""Measure how long the viewer takes to start, in fresh interpreters.
+
+Usage: python startup_benchmark.py [--runs N] [--budget MS]
+
+Each run imports tempChanges and, when a display is available, builds the main window.
+It prints the min and median time of every stage, and any heavy module that was loaded
+at start-up but should only load on first use. With --budget the script exits with 1 if the
+median total time is over the budget, so it can catch start-up regressions.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Modules that should only load once a feature needs them
+DEFERRED_MODULES = ("PIL", "sqlite3", "multiprocessing", "concurrent.futures")
+
+RUN_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import tempChanges
+timings = {"import": time.perf_counter() - started}
+try:
+    root = tempChanges.tk.Tk()
+except tempChanges.tk.TclError:
+    root = None  # No display; only the import can be measured
+if root is not None:
+    window_started = time.perf_counter()
+    app = tempChanges.YGOISOPatcher(root)
+    root.update_idletasks()
+    timings["window"] = time.perf_counter() - window_started
+    root.destroy()
+timings["total"] = time.perf_counter() - started
+loaded = [name for name in %r if name in sys.modules]
+print(json.dumps({"timings": timings, "loaded": loaded}))
+""" % (DEFERRED_MODULES,)
+
+
+def run_once(directory):
+    output = subprocess.run(
+        [sys.executable, "-c", RUN_SCRIPT], cwd=directory, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the viewer's cold start.")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budget", type=float, help="fail if the median total start-up time exceeds this many ms")
+    args = parser.parse_args(argv)
+
+    directory = os.path.dirname(os.path.abspath(__file__))
+    run_once(directory)  # Warm the OS file cache and write the bytecode caches
+    results = [run_once(directory) for _ in range(args.runs)]
+
+    for stage in results[0]["timings"]:
+        times = [result["timings"][stage] * 1000 for result in results]
+        print(f"{stage:<7} min {min(times):7.1f} ms   median {statistics.median(times):7.1f} ms")
+    loaded = sorted({name for result in results for name in result["loaded"]})
+    if loaded:
+        print(f"Loaded at start-up but should be deferred: {', '.join(loaded)}")
+
+    median_total = statistics.median(result["timings"]["total"] * 1000 for result in results)
+    if args.budget is not None and median_total > args.budget:
+        print(f"Start-up median {median_total:.1f} ms is over the {args.budget:.1f} ms budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""Synthetic disc images for the tests: random user data with catalogue signatures planted in it."""
+import random
+
+from fmmod import PatchEngine
+from fmmod.disc import SECTOR_SIZE, SYNC_PATTERN
+from fmmod.ecc import regenerate_sector
+
+GROUPS = {"drop_rate", "win_requirements", "exodia"}  # Signature groups, which need no particular image size
+SECTOR_COUNT = 48
+MODE2_FORM1_SUBHEADER = bytes([0, 0, 8, 0, 0, 0, 8, 0])
+
+
+def make_engine():
+    engine = PatchEngine()
+    engine.enabled_patches = set(GROUPS)
+    return engine
+
+
+def signature_patches():
+    """Return every resolved signature patch of GROUPS."""
+    catalogue_patches = make_engine().get_catalogue_patches()
+    return [patch for patches in catalogue_patches.values() for patch in patches if 'original' in patch]
+
+
+def user_data(seed=1, sector_count=SECTOR_COUNT):
+    """Return random user data with each signature planted inside its own sector."""
+    data = bytearray(random.Random(seed).randbytes(sector_count * SECTOR_SIZE))
+    for number, patch in enumerate(signature_patches()):
+        offset = (2 * number + 1) * SECTOR_SIZE + 100 + number
+        data[offset:offset + len(patch['original'])] = patch['original']
+    return data
+
+
+def bcd(value):
+    return (value // 10) << 4 | value % 10
+
+
+def raw_sector(lba, payload, mode=2, subheader=MODE2_FORM1_SUBHEADER):
+    """Return a raw 2352-byte sector with a valid EDC/ECC around payload."""
+    minutes, seconds = divmod(lba // 75 + 2, 60)  # Addresses start at 00:02:00
+    header = bytes([bcd(minutes), bcd(seconds), bcd(lba % 75), mode])
+    body = payload if mode == 1 else subheader + payload
+    return regenerate_sector(SYNC_PATTERN + header + body + bytes(2352 - 16 - len(body)))
+
+
+def raw_image(data):
+    """Wrap 2048-byte user data in Mode 2 Form 1 raw sectors, as on a BIN dump."""
+    return b"".join(
+        raw_sector(lba, data[lba * SECTOR_SIZE:(lba + 1) * SECTOR_SIZE]) for lba in range(len(data) // SECTOR_SIZE)
+    )
+
+
+def write_image(path, data):
+    with open(path, 'wb') as f:
+        f.write(data)
+    return path
+
+
+def read_image(path):
+    with open(path, 'rb') as f:
+        return f.read()
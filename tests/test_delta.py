@@ -0,0 +1,67 @@
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+from fmmod import delta
+from fmmod.delta import apply_delta_patch, write_bps_patch, write_ips_patch, write_ppf3_patch
+
+from images import make_engine, raw_image, read_image, user_data, write_image
+
+
+class DeltaRoundTripTest(unittest.TestCase):
+    """Applying a PPF, IPS or BPS patch to the source must give the same bytes as the copy output mode."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def check_round_trip(self, image, extension, patch_format):
+        source_path = write_image(os.path.join(self.directory, "source" + extension), image)
+        copy_path = make_engine().patch_image(source_path, "copy")
+        patch_path = make_engine().patch_image(source_path, patch_format)
+        output_path = os.path.join(self.directory, "applied" + extension)
+        apply_delta_patch(patch_path, source_path, output_path)
+        expected = read_image(copy_path)
+        self.assertNotEqual(expected, image)
+        self.assertEqual(read_image(output_path), expected)
+        self.assertEqual(read_image(source_path), image)
+
+    def test_iso(self):
+        image = bytes(user_data())
+        for patch_format in ("ppf", "ips", "bps"):
+            with self.subTest(patch_format):
+                self.check_round_trip(image, ".iso", patch_format)
+
+    def test_raw_bin(self):
+        # The regenerated EDC/ECC trailers have to travel in the patch as well
+        image = raw_image(user_data())
+        for patch_format in ("ppf", "ips", "bps"):
+            with self.subTest(patch_format):
+                self.check_round_trip(image, ".bin", patch_format)
+
+    def test_records_across_chunks(self):
+        rnd = random.Random(2)
+        source = rnd.randbytes(5000)
+        source_path = write_image(os.path.join(self.directory, "source.bin"), source)
+        target = bytearray(source)
+        records = []
+        for offset in sorted(rnd.sample(range(0, 4900, 50), 20)):
+            modified = rnd.randbytes(rnd.randint(1, 40))
+            records.append((offset, bytes(target[offset:offset + len(modified)]), modified))
+            target[offset:offset + len(modified)] = modified
+        output_path = os.path.join(self.directory, "applied.bin")
+        # A small chunk size makes records straddle chunk boundaries
+        with mock.patch.object(delta, "DELTA_CHUNK_SIZE", 7):
+            for patch_format, write_patch in (("ppf", write_ppf3_patch), ("ips", write_ips_patch), ("bps", write_bps_patch)):
+                with self.subTest(patch_format):
+                    patch_path = os.path.join(self.directory, "records." + patch_format)
+                    write_patch(patch_path, records, source_path)
+                    apply_delta_patch(patch_path, source_path, output_path)
+                    self.assertEqual(read_image(output_path), bytes(target))
+
+
+if __name__ == "__main__":
+    unittest.main()
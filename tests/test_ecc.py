@@ -0,0 +1,104 @@
+import os
+import random
+import tempfile
+import unittest
+
+from fmmod.disc import RAW_SECTOR_SIZE
+from fmmod.ecc import P_INDICES, P_OFFSET, Q_INDICES, Q_OFFSET, regenerate_sector
+
+from images import make_engine, raw_image, raw_sector, read_image, user_data, write_image
+
+# GF(2^8) with the ECMA-130 polynomial, built independently of fmmod.ecc's tables
+GF_EXP = [0] * 255
+GF_LOG = [0] * 256
+value = 1
+for power in range(255):
+    GF_EXP[power] = value
+    GF_LOG[value] = power
+    value <<= 1
+    if value & 0x100:
+        value ^= 0x11D
+
+
+def bitwise_edc(data):
+    edc = 0
+    for byte in data:
+        edc ^= byte
+        for _ in range(8):
+            edc = (edc >> 1) ^ (0xD8018001 if edc & 1 else 0)
+    return edc
+
+
+def parity_syndromes_clear(sector, indices, parity_offset):
+    """Check that every RSPC codeword (data bytes, then its two parity bytes) has zero syndromes."""
+    for major, row in enumerate(indices):
+        codeword = [sector[index] for index in row] + [sector[parity_offset + major], sector[parity_offset + major + len(indices)]]
+        s0 = s1 = 0
+        for position, byte in enumerate(codeword):
+            s0 ^= byte
+            if byte:
+                s1 ^= GF_EXP[(GF_LOG[byte] + len(codeword) - 1 - position) % 255]
+        if s0 or s1:
+            return False
+    return True
+
+
+def check_sector(test, sector):
+    """Assert a raw data sector's EDC and, where it has one, its ECC are valid."""
+    sector = bytearray(sector)
+    if sector[15] == 1:
+        test.assertEqual(sector[2064:2068], bitwise_edc(sector[0:2064]).to_bytes(4, 'little'))
+    elif sector[18] & 0x20:
+        test.assertEqual(sector[2348:2352], bitwise_edc(sector[16:2348]).to_bytes(4, 'little'))
+        return
+    else:
+        test.assertEqual(sector[2072:2076], bitwise_edc(sector[16:2072]).to_bytes(4, 'little'))
+        sector[12:16] = bytes(4)  # Mode 2 leaves the header out of the ECC
+    test.assertTrue(parity_syndromes_clear(sector, P_INDICES, P_OFFSET))
+    test.assertTrue(parity_syndromes_clear(sector, Q_INDICES, Q_OFFSET))
+
+
+class RegenerateSectorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.random = random.Random(3)
+
+    def test_mode1(self):
+        check_sector(self, raw_sector(200, self.random.randbytes(2048), mode=1))
+
+    def test_mode2_form1(self):
+        check_sector(self, raw_sector(200, self.random.randbytes(2048)))
+
+    def test_mode2_form2(self):
+        check_sector(self, raw_sector(200, self.random.randbytes(2324), subheader=bytes([0, 0, 0x20, 0, 0, 0, 0x20, 0])))
+
+    def test_changed_data_is_caught(self):
+        sector = bytearray(raw_sector(200, self.random.randbytes(2048)))
+        sector[500] ^= 0x01
+        with self.assertRaises(AssertionError):
+            check_sector(self, sector)
+        check_sector(self, regenerate_sector(sector))
+
+    def test_audio_sector_is_unchanged(self):
+        sector = self.random.randbytes(RAW_SECTOR_SIZE)
+        self.assertEqual(regenerate_sector(sector), sector)
+
+
+class PatchedImageTrailerTest(unittest.TestCase):
+    """A patched BIN must carry a valid EDC/ECC in every sector, including the patched ones."""
+
+    def test_copy_output(self):
+        with tempfile.TemporaryDirectory() as directory:
+            image = raw_image(user_data())
+            source_path = write_image(os.path.join(directory, "source.bin"), image)
+            patched = read_image(make_engine().patch_image(source_path, "copy"))
+        changed = 0
+        for start in range(0, len(patched), RAW_SECTOR_SIZE):
+            sector = patched[start:start + RAW_SECTOR_SIZE]
+            check_sector(self, sector)
+            changed += sector != image[start:start + RAW_SECTOR_SIZE]
+        self.assertGreater(changed, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from fmmod.journal import JOURNAL_VERSION, journal_path, read_patch_journal
+
+from images import make_engine, raw_image, read_image, user_data, write_image
+
+
+class JournalReversalTest(unittest.TestCase):
+    """Reversing every journaled patch must give back the source image byte for byte."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def patch_copy(self, image, extension):
+        source_path = write_image(os.path.join(self.directory, "source" + extension), image)
+        return make_engine().patch_image(source_path, "copy")
+
+    def test_full_reverse_to_copy(self):
+        for extension, image in ((".iso", bytes(user_data())), (".bin", raw_image(user_data()))):
+            with self.subTest(extension):
+                patched_path = self.patch_copy(image, extension)
+                names = {patch['patch_name'] for patch in read_patch_journal(patched_path)}
+                count, reversed_path = make_engine().reverse_journal(patched_path, names, "copy")
+                self.assertGreater(count, 0)
+                self.assertEqual(read_image(reversed_path), image)
+                self.assertFalse(os.path.exists(journal_path(reversed_path)))
+
+    def test_partial_then_full_reverse_in_place(self):
+        image = raw_image(user_data())
+        patched_path = self.patch_copy(image, ".bin")
+        make_engine().reverse_journal(patched_path, {"Exodia S-Tec"}, "in_place")
+        remaining = read_patch_journal(patched_path, read_image(patched_path))
+        self.assertTrue(remaining)
+        self.assertNotIn("Exodia S-Tec", {patch['patch_name'] for patch in remaining})
+        self.assertNotEqual(read_image(patched_path), image)
+
+        names = {patch['patch_name'] for patch in remaining}
+        make_engine().reverse_journal(patched_path, names, "in_place")
+        self.assertEqual(read_image(patched_path), image)
+        self.assertFalse(os.path.exists(journal_path(patched_path)))
+
+    def test_malformed_journal_is_ignored(self):
+        image = bytes(user_data())
+        image_path = write_image(os.path.join(self.directory, "source.iso"), image)
+        for journal in ({"version": JOURNAL_VERSION, "patches": []}, {"version": JOURNAL_VERSION, "patches": [], "size": len(image)}, []):
+            with self.subTest(journal=journal):
+                with open(journal_path(image_path), "w", encoding="utf-8") as f:
+                    json.dump(journal, f)
+                self.assertIsNone(read_patch_journal(image_path, image))
+                self.assertEqual(make_engine().load_journal(image_path), (image_path, []))
+
+    def test_journal_of_overwritten_image_is_ignored(self):
+        patched_path = self.patch_copy(bytes(user_data()), ".iso")
+        # An image copied over the patched one keeps the old journal next to it
+        shutil.copy(os.path.join(self.directory, "source.iso"), patched_path)
+        self.assertIsNone(read_patch_journal(patched_path, read_image(patched_path)))
+
+
+if __name__ == "__main__":
+    unittest.main()
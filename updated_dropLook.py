@@ -3,7 +3,6 @@ from tkinter import filedialog, messagebox, ttk
 import os
 import binascii
 import traceback
-from PIL import Image, ImageTk
 
 
 class YGOISOPatcher:
@@ -131,8 +130,6 @@ class YGOISOPatcher:
         }
 
         self.image_base_path = "./card_images/"
-        if not os.path.exists(self.image_base_path):
-            os.makedirs(self.image_base_path)
 
         # Initial GUI Setup
         self.setup_initial_gui()